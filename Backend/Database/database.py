@@ -1,8 +1,193 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Float
-from sqlalchemy.orm import declarative_base, relationship
-from Backend.config import DATABASE_URL
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, ForeignKey, Boolean, Float, Text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import count
+from Backend.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+
+# Drivers assíncronos usados para cada banco
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Converte uma URL de banco síncrona para o driver assíncrono equivalente.
+
+    Args:
+        url (str): URL no formato aceito pelo SQLAlchemy.
+
+    Raises:
+        RuntimeError: Caso não exista driver assíncrono para o banco.
+
+    Returns:
+        str: URL usando asyncpg (PostgreSQL) ou aiosqlite (SQLite).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Monta os parâmetros de pool definidos em `config.py` para um engine.
+
+    O SQLite usa pools próprios que não aceitam dimensionamento,
+    então para ele só o pre-ping é repassado.
+
+    Args:
+        url (str): URL do banco.
+
+    Returns:
+        dict: Argumentos para `create_engine`/`create_async_engine`.
+    """
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def utcnow() -> datetime:
+    """
+    Data/hora atual em UTC sem fuso, no formato das colunas DateTime.
+
+    O asyncpg não aceita datas com fuso em colunas `timestamp without
+    time zone`, então tudo que é gravado ou comparado usa UTC ingênuo.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # O SQLite só aplica ON DELETE CASCADE com foreign_keys ativado
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def database_url() -> str:
+    """
+    URL síncrona do banco, exigida só quando o primeiro engine é criado.
+
+    Raises:
+        RuntimeError: Caso `DATABASE_URL` não esteja definida.
+
+    Returns:
+        str: Valor de `DATABASE_URL`.
+    """
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL is not set")
+    return DATABASE_URL
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Engine síncrono, criado no primeiro uso e reaproveitado."""
+    url = database_url()
+    engine = create_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """Engine assíncrono, criado no primeiro uso e reaproveitado."""
+    url = ASYNC_DATABASE_URL or to_async_url(database_url())
+    engine = create_async_engine(url, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    return engine
+
+
+# Fábricas de sessão criadas uma única vez e reaproveitadas por requisição
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine())
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), expire_on_commit=False)
+
+
+def SessionLocal() -> Session:
+    """Abre uma sessão síncrona no engine padrão."""
+    return get_sessionmaker()()
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Abre uma sessão assíncrona no engine padrão."""
+    return get_async_sessionmaker()()
+
+
+@lru_cache(maxsize=None)
+def get_replica_engines() -> tuple:
+    """Engines assíncronos das réplicas de `DATABASE_REPLICA_URLS`, criados no primeiro uso."""
+    engines = []
+    for url in DATABASE_REPLICA_URLS:
+        async_url = to_async_url(url)
+        engine = create_async_engine(async_url, **engine_options(async_url))
+        if engine.dialect.name == "sqlite":
+            event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        engines.append(engine)
+    return tuple(engines)
+
+
+@lru_cache(maxsize=None)
+def get_replica_sessionmakers() -> tuple:
+    return tuple(
+        async_sessionmaker(bind=engine, expire_on_commit=False)
+        for engine in get_replica_engines()
+    )
+
+
+_replica_turn = count()
+
+
+def ReplicaSessionLocal() -> AsyncSession:
+    """
+    Abre uma sessão assíncrona de leitura.
+
+    As réplicas são usadas em rodízio; sem réplicas configuradas,
+    a sessão é aberta no primário.
+    """
+    factories = get_replica_sessionmakers()
+    if not factories:
+        return AsyncSessionLocal()
+    return factories[next(_replica_turn) % len(factories)]()
+
+
+async def dispose_engines():
+    """Fecha as conexões dos engines que chegaram a ser criados."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_replica_engines.cache_info().currsize:
+        for engine in get_replica_engines():
+            await engine.dispose()
+
 
-db = create_engine(DATABASE_URL, pool_pre_ping=True)
 Base = declarative_base()
 
 class User(Base):
@@ -15,10 +200,14 @@ class User(Base):
     ativo = Column("ativo", Boolean, nullable=False)
     remember = Column("remember", Boolean, nullable=False)
     admin = Column("admin", Boolean, default=False)
+    # Incrementada a cada escrita que muda /users/me ou /requests/me (ETags)
+    version = Column("version", Integer, nullable=False, default=0, server_default="0")
 
-    tokens = relationship("Token", back_populates="user")
-    orders = relationship("Order", back_populates="user")
-    locals = relationship("Local", back_populates="user")
+    # As linhas filhas são removidas pelo ON DELETE CASCADE do banco,
+    # sem o ORM precisar carregá-las antes
+    tokens = relationship("Token", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    orders = relationship("Order", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    locals = relationship("Local", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     def __init__(self, name, email, senha, ativo, remember, admin):
         self.name = name
@@ -39,7 +228,7 @@ class Local(Base):
     number = Column(String(10), nullable=False)
     complement = Column(String(100), nullable=True)
 
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     user = relationship("User", back_populates="locals")
 
     def __init__(self, cep, city, neighborhood, street, number, complement=None):
@@ -53,15 +242,20 @@ class Local(Base):
 class Token(Base):
     __tablename__ = 'tokens'
 
-    token = Column(String(200), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    # SHA-256 (hex) do JWT; o token em si nunca é gravado
+    token_hash = Column(String(64), primary_key=True)
+    jti = Column(String(32), unique=True, nullable=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
 
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     is_active = Column(Boolean, default=True)
+    remember = Column(Boolean, nullable=False, default=False)
 
     user = relationship("User", back_populates="tokens")
-    def __init__(self, token, user_id, expires_at, is_active=True):
-        self.token = token
+    def __init__(self, token_hash, user_id, expires_at, is_active=True, jti=None, remember=False):
+        self.token_hash = token_hash
+        self.jti = jti
+        self.remember = remember
         self.user_id = user_id
         self.expires_at = expires_at
         self.is_active = is_active
@@ -71,16 +265,18 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    # Total em centavos calculado na criação (nulo em pedidos antigos)
+    total_cents = Column(Integer, nullable=True)
 
-    items = relationship("OrderItem", back_populates="order")
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", passive_deletes=True)
     user = relationship("User", back_populates="orders")
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True)
 
     product_id = Column(String)
     qty = Column(Integer)
@@ -88,4 +284,47 @@ class OrderItem(Base):
     addon_id = Column(String, nullable=True)
 
     order = relationship("Order", back_populates="items")
-    
\ No newline at end of file
+
+
+class UserOrderStats(Base):
+    """Totais de pedidos por usuário, mantidos junto com cada escrita em orders."""
+    __tablename__ = "user_order_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    items = Column(Integer, nullable=False, default=0)
+
+class UserProductStats(Base):
+    """Totais por usuário e produto: pedidos que contêm o produto e quantidade somada."""
+    __tablename__ = "user_product_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(String, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    qty = Column(Integer, nullable=False, default=0)
+
+
+class RevokedToken(Base):
+    """
+    Tokens revogados de usuários removidos.
+
+    Sem chave estrangeira de propósito: o ON DELETE CASCADE remove as
+    linhas de `tokens` junto com o usuário, e esta tabela mantém os
+    `jti` na denylist até os tokens expirarem.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class IdempotencyKey(Base):
+    """Resposta gravada para um `Idempotency-Key`, reenviada em repetições."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    body = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """
+    Conta os comandos SQL executados em um engine enquanto ativo.
+
+    Aceita engines síncronos e assíncronos. Usado em testes para
+    garantir que um endpoint executa um número fixo de consultas,
+    independente da quantidade de registros (detecção de N+1).
+
+    Exemplo:
+        with QueryCounter(get_async_engine()) as counter:
+            client.get("/requests/me", headers=headers)
+        assert counter.count == 3, counter.statements
+    """
+
+    def __init__(self, engine):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
+
+
+@contextmanager
+def assert_num_queries(engine, expected: int):
+    """
+    Falha se o bloco executar um número de comandos SQL diferente do esperado.
+
+    Args:
+        engine (Engine | AsyncEngine): Engine monitorado.
+        expected (int): Quantidade exata de comandos esperada.
+
+    Raises:
+        AssertionError: Caso a contagem seja diferente, listando os comandos.
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+
+    if counter.count != expected:
+        listed = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(counter.statements, 1))
+        raise AssertionError(
+            f"Expected {expected} queries, got {counter.count}:\n{listed}"
+        )
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from sqlalchemy import delete, select, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from Backend.config import AUTH_MODE
+from Backend.Database.database import AsyncSessionLocal, Token, RevokedToken, IdempotencyKey, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+async def reap_tokens(session: AsyncSession, batch_size: int) -> int:
+    """
+    Remove tokens expirados ou inativos em lotes limitados, e as
+    revogações de usuários removidos (`revoked_tokens`) já expiradas.
+
+    Cada lote é um DELETE separado e com commit próprio, para não
+    manter locks longos sobre a tabela. Com `AUTH_MODE=jwt`, tokens
+    revogados só são removidos depois de expirar, pois alimentam
+    a denylist até lá.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco de dados.
+        batch_size (int): Quantidade máxima de linhas por DELETE.
+
+    Returns:
+        int: Total de tokens removidos.
+    """
+    condition = Token.expires_at <= utcnow()
+    if AUTH_MODE == "database":
+        condition = or_(condition, Token.is_active == False)
+
+    total = 0
+    while True:
+        batch = select(Token.token_hash).where(condition).limit(batch_size)
+        result = await session.execute(
+            delete(Token)
+            .where(Token.token_hash.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+    while True:
+        batch = select(RevokedToken.jti).where(RevokedToken.expires_at <= utcnow()).limit(batch_size)
+        result = await session.execute(
+            delete(RevokedToken)
+            .where(RevokedToken.jti.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def reap_idempotency_keys(session: AsyncSession, batch_size: int) -> int:
+    """
+    Remove respostas de idempotência expiradas em lotes limitados.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco de dados.
+        batch_size (int): Quantidade máxima de linhas por DELETE.
+
+    Returns:
+        int: Total de chaves removidas.
+    """
+    total = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= utcnow())
+            .limit(batch_size)
+        )
+        result = await session.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def run_token_reaper(interval: float, batch_size: int):
+    """
+    Executa `reap_tokens` e `reap_idempotency_keys` periodicamente até ser cancelado.
+
+    Args:
+        interval (float): Segundos entre execuções.
+        batch_size (int): Quantidade máxima de linhas por DELETE.
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                removed = await reap_tokens(session, batch_size)
+                expired_keys = await reap_idempotency_keys(session, batch_size)
+            if removed or expired_keys:
+                logger.info("Token reaper removed %d tokens and %d idempotency keys", removed, expired_keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Token reaper failed")
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,104 @@
+from collections import Counter
+from sqlalchemy import update, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from Backend.Database.database import UserOrderStats, UserProductStats
+
+# Dialetos com INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def product_totals(items) -> Counter:
+    """
+    Soma as quantidades de uma lista de itens por produto.
+
+    Args:
+        items (Iterable): Itens com `product_id` e `qty`.
+
+    Returns:
+        Counter: Quantidade total por `product_id`.
+    """
+    totals = Counter()
+    for item in items:
+        totals[item.product_id] += item.qty
+    return totals
+
+
+async def apply_order_stats(
+    session: AsyncSession,
+    user_id: int,
+    orders_delta: int,
+    before: Counter,
+    after: Counter,
+    product_orders: Counter = None
+):
+    """
+    Atualiza os agregados do usuário a partir da diferença entre dois estados.
+
+    Deve ser chamada na mesma transação da escrita em orders/order_items.
+    Criação: `before` vazio; remoção: `after` vazio; alteração: ambos.
+    Cada tabela recebe um único UPSERT somando os deltas.
+
+    Para um único pedido, a variação de pedidos por produto sai da
+    presença do produto em `before`/`after`. Quando `after` soma vários
+    pedidos (criação em lote), `product_orders` deve informar em
+    quantos deles cada produto aparece.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco.
+        user_id (int): Dono dos pedidos.
+        orders_delta (int): Variação na quantidade de pedidos.
+        before (Counter): Quantidade por produto antes da escrita.
+        after (Counter): Quantidade por produto depois da escrita.
+        product_orders (Counter | None): Pedidos criados que contêm cada produto.
+    """
+    product_rows = []
+    for product_id in before.keys() | after.keys():
+        qty_delta = after[product_id] - before[product_id]
+        if product_orders is not None:
+            orders_delta_product = product_orders[product_id]
+        else:
+            orders_delta_product = int(product_id in after) - int(product_id in before)
+        if qty_delta or orders_delta_product:
+            product_rows.append({
+                "user_id": user_id,
+                "product_id": product_id,
+                "orders": orders_delta_product,
+                "qty": qty_delta,
+            })
+
+    items_delta = sum(after.values()) - sum(before.values())
+    if orders_delta or items_delta:
+        await _upsert_add(
+            session, UserOrderStats, ["user_id"],
+            [{"user_id": user_id, "orders": orders_delta, "items": items_delta}]
+        )
+    if product_rows:
+        await _upsert_add(session, UserProductStats, ["user_id", "product_id"], product_rows)
+
+
+async def _upsert_add(session: AsyncSession, model, keys: list, rows: list):
+    """Soma os valores de `rows` às linhas existentes, criando as que faltam."""
+    counters = [column for column in rows[0] if column not in keys]
+    dialect = session.get_bind().dialect.name
+
+    if dialect in UPSERT_INSERTS:
+        stmt = UPSERT_INSERTS[dialect](model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: getattr(model, column) + stmt.excluded[column] for column in counters}
+        )
+        await session.execute(stmt)
+        return
+
+    for row in rows:
+        result = await session.execute(
+            update(model)
+            .where(*(getattr(model, key) == row[key] for key in keys))
+            .values({column: getattr(model, column) + row[column] for column in counters})
+        )
+        if result.rowcount == 0:
+            await session.execute(insert(model).values(row))
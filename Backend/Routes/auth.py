@@ -1,78 +1,190 @@
-import bcrypt
+import uuid
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from jose import jwt
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
-from ..config import SECRET_KEY, ALGORITHM, oauth2_schema
-from ..Database.database import User, Token
-from ..Routes.resources import get_session
+from ..config import SECRET_KEY, ALGORITHM, TOKEN_REUSE, TOKEN_REUSE_MIN_REMAINING_SECONDS, oauth2_schema
+from ..Database.database import User, Token, utcnow
+from ..Routes.resources import get_async_session, verify_token, token_cache, token_denylist, Principal
 from ..schemas import LoginSchema
+from ..security import password_hasher, token_digest
 
 auth_router = APIRouter(prefix="/auth", tags=['Auth'])
 
 
-def authenticate_user(email, senha, session):
+async def authenticate_user(email, senha, session):
     """
     Autentica um usuário com base em email e senha.
 
+    A verificação do bcrypt roda no pool dedicado, sem bloquear
+    o event loop. Se o hash armazenado usa um custo diferente do
+    atual, a senha é refeita com o novo custo após o login.
+
     Args:
         email (str): Email do usuário.
         senha (str): Senha em texto puro fornecida pelo usuário.
-        session (Session): Sessão ativa do banco de dados.
+        session (AsyncSession): Sessão ativa do banco de dados.
 
     Returns:
         User | bool:
             Retorna o objeto User se a autenticação for bem-sucedida,
             caso contrário retorna False.
     """
-    user = session.query(User).filter(User.email == email).first()
+    result = await session.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     senha_str = senha.get_secret_value() if hasattr(senha, "get_secret_value") else str(senha)
-    senha_bytes = senha_str.encode("utf-8")
 
     if not user:
         return False
-    elif not bcrypt.checkpw(senha_bytes, user.senha.encode('utf-8')):
+    elif not await password_hasher.check(senha_str, user.senha):
         return False
-    else:
-        return user
+
+    if password_hasher.needs_rehash(user.senha):
+        user.senha = await password_hasher.hash(senha_str)
+        await session.commit()
+
+    return user
 
 
-def create_token(user_id: int, remember: bool):
+def create_token(user_id: int, remember: bool, admin: bool = False):
     """
     Cria um token JWT para o usuário autenticado.
 
+    Além de `sub` e `exp`, o token carrega um identificador único
+    (`jti`), usado na revogação, e a flag de administrador (`adm`),
+    usada pela validação sem banco (`AUTH_MODE=jwt`).
+
     Args:
         user_id (int): ID do usuário autenticado.
         remember (bool): Define se o token terá expiração longa ou curta.
+        admin (bool): Indica se o usuário é administrador.
 
     Returns:
-        tuple[str, datetime]:
-            Token JWT gerado e data/hora de expiração.
+        tuple[str, datetime, str]:
+            Token JWT gerado, data/hora de expiração e seu `jti`.
     """
     expires = timedelta(days=30) if remember else timedelta(minutes=30)
     expires_at = datetime.now(timezone.utc) + expires
+    jti = uuid.uuid4().hex
+
+    token = encode_token(user_id, expires_at, jti, admin)
+    return token, expires_at, jti
+
+
+def encode_token(user_id: int, expires_at: datetime, jti: str, admin: bool) -> str:
+    """
+    Assina o payload do token.
+
+    A assinatura HS256 é determinística: os mesmos dados sempre geram
+    o mesmo token, o que permite reconstruir um token já emitido.
+
+    Args:
+        user_id (int): ID do usuário.
+        expires_at (datetime): Data/hora de expiração (UTC).
+        jti (str): Identificador único do token.
+        admin (bool): Indica se o usuário é administrador.
+
+    Returns:
+        str: Token JWT.
+    """
+    from jose import jwt
+
+    payload = {"sub": str(user_id), "exp": expires_at, "jti": jti, "adm": bool(admin)}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-    payload = {"sub": str(user_id),"exp": expires_at}
 
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+async def find_reusable_token(session, user):
+    """
+    Procura um token ativo do usuário que ainda possa ser devolvido.
+
+    Só o digest do token é armazenado, então o token é reconstruído
+    a partir dos dados da linha e conferido contra o digest. Se algo
+    mudou desde a emissão (ex.: a flag de administrador), o token
+    não é reaproveitado.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco de dados.
+        user (User): Usuário autenticado.
+
+    Returns:
+        tuple[str, datetime] | None: Token e expiração, ou None.
+    """
+    min_expires_at = utcnow() + timedelta(seconds=TOKEN_REUSE_MIN_REMAINING_SECONDS)
+    result = await session.execute(
+        select(Token)
+        .where(
+            Token.user_id == user.id,
+            Token.is_active == True,
+            Token.remember == bool(user.remember),
+            Token.jti.isnot(None),
+            Token.expires_at > min_expires_at
+        )
+        .order_by(Token.expires_at.desc())
+        .limit(1)
+    )
+    token_db = result.scalars().first()
+    if not token_db:
+        return None
+
+    expires_at = token_db.expires_at.replace(tzinfo=timezone.utc)
+    token = encode_token(user.id, expires_at, token_db.jti, user.admin)
+    if token_digest(token) != token_db.token_hash:
+        return None
+
+    return token, expires_at
+
+
+async def issue_token(session, user):
+    """
+    Entrega um token de acesso para o usuário autenticado.
+
+    Com `TOKEN_REUSE` ativo, devolve um token válido já emitido para
+    o usuário quando houver; caso contrário cria e persiste um novo.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco de dados.
+        user (User): Usuário autenticado.
+
+    Returns:
+        tuple[str, datetime]: Token JWT e data/hora de expiração.
+    """
+    if TOKEN_REUSE:
+        reusable = await find_reusable_token(session, user)
+        if reusable:
+            return reusable
+
+    token, expires_at, jti = create_token(user.id, user.remember, user.admin)
+
+    token_db = Token(
+        token_hash=token_digest(token),
+        jti=jti,
+        user_id=user.id,
+        expires_at=expires_at.replace(tzinfo=None),
+        is_active=True,
+        remember=bool(user.remember)
+    )
+
+    session.add(token_db)
+    await session.commit()
     return token, expires_at
 
 
 @auth_router.post('/login')
 async def login(
     login_schema: LoginSchema,
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Endpoint de login via JSON.
 
     Valida as credenciais do usuário e gera um token JWT válido,
-    persistindo-o no banco de dados.
+    persistindo-o no banco de dados (ou reaproveita um token ativo,
+    ver `issue_token`).
 
     Args:
         login_schema (LoginSchema): Dados de autenticação do usuário.
-        db (Session): Sessão do banco de dados injetada pelo FastAPI.
+        db (AsyncSession): Sessão do banco de dados injetada pelo FastAPI.
 
     Raises:
         HTTPException: Caso email ou senha estejam incorretos.
@@ -80,7 +192,7 @@ async def login(
     Returns:
         dict: Token de acesso, tipo e data de expiração.
     """
-    user = authenticate_user(
+    user = await authenticate_user(
         login_schema.email,
         login_schema.senha,
         db
@@ -92,16 +204,7 @@ async def login(
             detail='Email ou senha incorretos'
         )
 
-    token, expires_at = create_token(user.id, user.remember)
-
-    token_db = Token(
-        user_id=user.id,
-        token=token,
-        expires_at=expires_at
-    )
-
-    db.add(token_db)
-    db.commit()
+    token, expires_at = await issue_token(db, user)
 
     return {
         "access_token": token,
@@ -113,7 +216,7 @@ async def login(
 @auth_router.post('/login-form', include_in_schema=False)
 async def login_form(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        session: Session = Depends(get_session)):
+        session: AsyncSession = Depends(get_async_session)):
     """
     Endpoint de login compatível com OAuth2PasswordRequestForm.
 
@@ -122,7 +225,7 @@ async def login_form(
 
     Args:
         form_data (OAuth2PasswordRequestForm): Credenciais do formulário.
-        session (Session): Sessão do banco de dados.
+        session (AsyncSession): Sessão do banco de dados.
 
     Raises:
         HTTPException: Caso as credenciais sejam inválidas.
@@ -130,20 +233,11 @@ async def login_form(
     Returns:
         dict: Token de acesso e tipo.
     """
-    user = authenticate_user(form_data.username, form_data.password, session)
+    user = await authenticate_user(form_data.username, form_data.password, session)
     if not user:
         raise HTTPException(status_code=400, detail="Email ou senha incorreto")
 
-    token, expires_at = create_token(user.id, user.remember)
-    token_db = Token(
-        token=token,
-        user_id=user.id,
-        expires_at=expires_at,
-        is_active=True
-    )
-
-    session.add(token_db)
-    session.commit()
+    token, expires_at = await issue_token(session, user)
     return {
         "access_token": token,
         "token_type": "bearer"
@@ -151,7 +245,7 @@ async def login_form(
 
 
 @auth_router.post('/logout')
-def logout(token: str = Depends(oauth2_schema), db: Session = Depends(get_session)):
+async def logout(token: str = Depends(oauth2_schema), db: AsyncSession = Depends(get_async_session)):
     """
     Endpoint de logout do usuário.
 
@@ -159,7 +253,7 @@ def logout(token: str = Depends(oauth2_schema), db: Session = Depends(get_sessio
 
     Args:
         token (str): Token JWT obtido via dependência OAuth2.
-        db (Session): Sessão do banco de dados.
+        db (AsyncSession): Sessão do banco de dados.
 
     Raises:
         HTTPException: Caso o token já esteja inválido.
@@ -167,10 +261,65 @@ def logout(token: str = Depends(oauth2_schema), db: Session = Depends(get_sessio
     Returns:
         dict: Mensagem de sucesso.
     """
-    token_db = db.query(Token).filter(Token.token == token, Token.is_active==True).first()
+    token_hash = token_digest(token)
+    result = await db.execute(select(Token).where(Token.token_hash == token_hash, Token.is_active==True))
+    token_db = result.scalars().first()
 
     if not token_db:
         raise HTTPException(status_code=401, detail="Token já inválido")
     token_db.is_active = False
-    db.commit()
+    await db.commit()
+    token_cache.invalidate(token_hash)
+    if token_db.jti:
+        token_denylist.add(token_db.jti)
     return {'message': 'Logout realizado com sucesso'}
+
+
+@auth_router.post('/logout-all')
+async def logout_all(user: Principal = Depends(verify_token), db: AsyncSession = Depends(get_async_session)):
+    """
+    Encerra todas as sessões do usuário.
+
+    Invalida todos os tokens ativos do usuário com um único UPDATE.
+
+    Args:
+        user (Principal): Usuário autenticado.
+        db (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Mensagem de sucesso e quantidade de tokens revogados.
+    """
+    result = await db.execute(
+        update(Token)
+        .where(Token.user_id == user.id, Token.is_active == True)
+        .values(is_active=False)
+        .returning(Token.jti)
+    )
+    jtis = [jti for jti in result.scalars().all() if jti]
+    await db.commit()
+
+    token_cache.discard_if(lambda principal: principal.id == user.id)
+    for jti in jtis:
+        token_denylist.add(jti)
+
+    return {'message': 'Logout realizado em todos os dispositivos', 'revoked': len(jtis)}
+
+
+@auth_router.get('/token-cache')
+def token_cache_stats(user: Principal = Depends(verify_token)):
+    """
+    Retorna os contadores do cache de tokens (apenas administradores).
+
+    Args:
+        user (Principal): Usuário autenticado.
+
+    Raises:
+        HTTPException: Caso o usuário não seja administrador.
+
+    Returns:
+        dict: Acertos, falhas e ocupação do cache.
+    """
+    if not user.admin:
+        raise HTTPException(status_code=403, detail='Você não tem autorização para fazer essa operação!')
+
+    return token_cache.stats()
@@ -1,117 +1,662 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
-from ..Database.database import OrderItem, User, Order
-from ..schemas import OrderCreateSchema, OrderResponseSchema, OrderItemCreateSchema, OrderItemResponseSchema
-from ..Routes.resources import get_session, verify_token
-from typing import List, Optional
+import csv
+import io
+import json
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse, JSONResponse
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..Database.database import OrderItem, User, Order, UserOrderStats, UserProductStats
+from ..Database.stats import apply_order_stats, product_totals
+from ..etag import bump_user_version, user_version, make_etag, etag_matches, cache_headers, not_modified
+from ..schemas import (
+    OrderCreateSchema,
+    OrderResponseSchema,
+    OrderItemCreateSchema,
+    OrderItemResponseSchema,
+    OrderPageSchema,
+    OrderBatchCreateSchema,
+    OrderBatchResponseSchema,
+    OrderSummarySchema,
+    OrderQuoteSchema,
+    OrderQuoteResponseSchema,
+)
+from ..config import MAX_BATCH_ORDERS, MAX_QUOTE_CARTS, EXPORT_BATCH_SIZE
+from ..idempotency import idempotency_store, request_fingerprint
+from ..catalog import catalog_store, validate_order_items
+from ..pricing import price_carts, order_total
+from ..pagination import keyset_rows
+from ..serialization import FastJSONResponse, ORDER_COLUMNS, attach_items
+from ..Routes.resources import (
+    get_async_session,
+    get_read_session,
+    read_session_factory,
+    pin_to_primary,
+    verify_token,
+    Principal,
+)
+from typing import List, Literal, Optional
 requestes_router = APIRouter(prefix='/requests', tags=['Requests'], dependencies=[Depends(verify_token)])
 
 
 
+
 @requestes_router.post("", response_model=OrderResponseSchema)
 async def create_order(
     order_create_schema: OrderCreateSchema,
-    user: User = Depends(verify_token),
-    session: Session = Depends(get_session),
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_async_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     """
     Cria um novo pedido para o usuário autenticado.
 
+    Com o header `Idempotency-Key`, repetições da mesma requisição
+    (ex.: reenvio após timeout) devolvem a resposta original em vez
+    de criar outro pedido.
+
     Args:
         order_create_schema (OrderCreateSchema): Dados do pedido a ser criado.
-        user (User): Usuário autenticado via token.
-        session (Session): Sessão ativa do banco de dados.
+        user (Principal): Usuário autenticado via token.
+        session (AsyncSession): Sessão ativa do banco de dados.
+        idempotency_key (str | None): Chave de idempotência enviada pelo cliente.
+
+    Raises:
+        HTTPException: Caso algum item não exista no catálogo ou a chave
+            já tenha sido usada com outro conteúdo.
 
     Returns:
-        Order: Pedido recém-criado.
+        Order | JSONResponse: Pedido recém-criado ou a resposta original.
     """
-    new_order = Order(user_id=user.id)
+    items = validate_order_items(order_create_schema.items)
+
+    if idempotency_key is None:
+        new_order = await add_order(session, user.id, items)
+        await session.commit()
+        pin_to_primary(user.id)
+        return new_order
+
+    fingerprint = request_fingerprint(order_create_schema)
+    async with idempotency_store.in_flight(user.id, idempotency_key):
+        replay = await idempotency_store.replay(session, user.id, idempotency_key, fingerprint)
+        if replay is not None:
+            return replay
+
+        new_order = await add_order(session, user.id, items)
+        await session.flush()
+        body = OrderResponseSchema.model_validate(new_order).model_dump(mode="json", by_alias=True)
+        idempotency_store.record(session, user.id, idempotency_key, fingerprint, 200, body)
+
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Outro processo gravou a mesma chave primeiro: este pedido é descartado
+            await session.rollback()
+            replay = await idempotency_store.replay(session, user.id, idempotency_key, fingerprint)
+            if replay is None:
+                raise
+            return replay
+
+        pin_to_primary(user.id)
+        return JSONResponse(content=body)
+
+
+async def add_order(session: AsyncSession, user_id: int, items) -> Order:
+    """
+    Adiciona um pedido e seus itens à transação atual, sem confirmar.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco de dados.
+        user_id (int): Dono do pedido.
+        items (list[CatalogItem]): Itens já validados no catálogo.
+
+    Returns:
+        Order: Pedido adicionado à sessão.
+    """
+    new_order = Order(user_id=user_id, total_cents=order_total(items))
 
     new_order.items = [
-    OrderItem(
-        product_id=item.product_id,
-        qty=item.qty,
-        size_id=item.size_id,
-        addon_id=item.addon_id
-    )
-    for item in order_create_schema.items
-]
+        OrderItem(
+            product_id=item.product_id,
+            qty=item.qty,
+            size_id=item.size_id,
+            addon_id=item.addon_id
+        )
+        for item in items
+    ]
 
     session.add(new_order)
-    session.commit()
+    await apply_order_stats(session, user_id, 1, Counter(), product_totals(new_order.items))
+    await bump_user_version(session, user_id)
     return new_order
 
 
-@requestes_router.get('/me', response_model=List[OrderResponseSchema])
-async def list_order(user: User = Depends(verify_token), session: Session = Depends(get_session)):
+def order_item_rows(order_id: int, items) -> list:
     """
-    Retorna um pedido específico com base no ID.
+    Converte os itens de um pedido em linhas para INSERT em lote.
 
     Args:
         order_id (int): ID do pedido.
-        user (User): Usuário autenticados.
-        session (Session): Sessão do banco de dados.
+        items (list[CatalogItem]): Itens do pedido.
+
+    Returns:
+        list[dict]: Parâmetros de `order_items`.
+    """
+    return [
+        {
+            "order_id": order_id,
+            "product_id": item.product_id,
+            "qty": item.qty,
+            "size_id": item.size_id,
+            "addon_id": item.addon_id,
+        }
+        for item in items
+    ]
+
+
+async def insert_orders_bulk(session: AsyncSession, user_id: int, orders) -> list:
+    """
+    Insere vários pedidos com INSERTs de múltiplas linhas.
+
+    Os IDs dos pedidos voltam via RETURNING, na ordem dos parâmetros,
+    quando o banco suporta; caso contrário os pedidos são inseridos
+    pelo ORM, que ainda agrupa os INSERTs de itens. Os totais de todos
+    os pedidos são calculados em uma única chamada a `price_carts`.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco.
+        user_id (int): Dono dos pedidos.
+        orders (list[list[CatalogItem]]): Itens de cada pedido a inserir.
+
+    Returns:
+        list[int]: IDs dos pedidos criados, na mesma ordem.
+    """
+    totals = [quote.total_cents for quote in price_carts(orders)]
+
+    dialect = session.get_bind().dialect
+    if not dialect.insert_executemany_returning_sort_by_parameter_order:
+        new_orders = [Order(user_id=user_id, total_cents=total) for total in totals]
+        session.add_all(new_orders)
+        await session.flush()
+        order_ids = [order.id for order in new_orders]
+    else:
+        result = await session.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [{"user_id": user_id, "total_cents": total} for total in totals]
+        )
+        order_ids = list(result.scalars())
+
+    item_rows = []
+    for order_id, items in zip(order_ids, orders):
+        item_rows.extend(order_item_rows(order_id, items))
+    await session.execute(insert(OrderItem), item_rows)
+
+    return order_ids
+
+
+@requestes_router.post("/quote", response_model=OrderQuoteResponseSchema)
+async def quote_orders(quote: OrderQuoteSchema):
+    """
+    Calcula o preço de vários carrinhos sem gravar nada.
+
+    Todos os carrinhos são validados no catálogo e precificados em
+    uma única chamada a `price_carts`.
+
+    Args:
+        quote (OrderQuoteSchema): Carrinhos a precificar.
+
+    Raises:
+        HTTPException: Caso haja carrinhos demais ou itens fora do catálogo.
+
+    Returns:
+        dict: Preço por linha e total de cada carrinho, e o total geral.
+    """
+    if len(quote.carts) > MAX_QUOTE_CARTS:
+        raise HTTPException(status_code=413, detail=f'Máximo de {MAX_QUOTE_CARTS} carrinhos por cotação')
+
+    catalog = catalog_store.get()
+    carts = []
+    errors = []
+    for index, cart in enumerate(quote.carts):
+        try:
+            carts.append(catalog.resolve_items(cart.items))
+        except ValueError as exc:
+            errors.append(f"carts.{index}: {exc}")
+    if errors:
+        raise HTTPException(status_code=422, detail="; ".join(errors))
+
+    quotes = price_carts(carts)
+    return {
+        "carts": [
+            {
+                "items": [
+                    {
+                        "product_id": item.product_id,
+                        "qty": item.qty,
+                        "size_id": item.size_id,
+                        "addon_id": item.addon_id,
+                        "unit_price_cents": unit_price,
+                        "total_cents": line_total,
+                    }
+                    for item, unit_price, line_total in zip(items, cart.unit_prices, cart.line_totals)
+                ],
+                "total_cents": cart.total_cents,
+            }
+            for items, cart in zip(carts, quotes)
+        ],
+        "total_cents": sum(cart.total_cents for cart in quotes),
+    }
+
+
+@requestes_router.post("/batch", response_model=OrderBatchResponseSchema)
+async def create_orders_batch(
+    batch: OrderBatchCreateSchema,
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Cria vários pedidos do usuário autenticado em uma única transação.
+
+    Cada pedido é validado separadamente, no formato e no catálogo. Os
+    válidos são gravados com INSERTs em lote; se o lote falhar no banco,
+    os pedidos são regravados um a um em savepoints, para que só os
+    problemáticos sejam descartados.
+
+    Args:
+        batch (OrderBatchCreateSchema): Pedidos a serem criados.
+        user (Principal): Usuário autenticado via token.
+        session (AsyncSession): Sessão ativa do banco de dados.
 
     Raises:
-        HTTPException: Se o pedido não existir ou não pertencer ao usuário.
+        HTTPException: Caso o lote exceda `MAX_BATCH_ORDERS`.
 
     Returns:
-        list[Order]: Lista contendo o pedido encontrado.
+        dict: Resultado de cada pedido, na ordem recebida.
     """
-    orders = session.query(Order).filter(Order.user_id == user.id).all()
+    if len(batch.orders) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=413, detail=f'Máximo de {MAX_BATCH_ORDERS} pedidos por lote')
+
+    catalog = catalog_store.get()
+    results = [None] * len(batch.orders)
+    valid = []
+    for index, payload in enumerate(batch.orders):
+        try:
+            order = OrderCreateSchema.model_validate(payload)
+        except ValidationError as exc:
+            error = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors()
+            )
+            results[index] = {"index": index, "ok": False, "error": error}
+            continue
+        if not order.items:
+            results[index] = {"index": index, "ok": False, "error": "Pedido sem itens"}
+            continue
+        try:
+            items = catalog.resolve_items(order.items)
+        except ValueError as exc:
+            results[index] = {"index": index, "ok": False, "error": str(exc)}
+            continue
+        valid.append((index, items))
+
+    if valid:
+        try:
+            async with session.begin_nested():
+                order_ids = await insert_orders_bulk(session, user.id, [items for _, items in valid])
+            created_orders = [items for _, items in valid]
+            for (index, _), order_id in zip(valid, order_ids):
+                results[index] = {"index": index, "ok": True, "order_id": order_id}
+        except SQLAlchemyError:
+            created_orders = []
+            for index, items in valid:
+                try:
+                    async with session.begin_nested():
+                        [order_id] = await insert_orders_bulk(session, user.id, [items])
+                    results[index] = {"index": index, "ok": True, "order_id": order_id}
+                    created_orders.append(items)
+                except SQLAlchemyError as exc:
+                    results[index] = {"index": index, "ok": False, "error": type(exc).__name__}
+
+        if created_orders:
+            after = product_totals(item for items in created_orders for item in items)
+            product_orders = Counter(
+                product_id
+                for items in created_orders
+                for product_id in {item.product_id for item in items}
+            )
+            await apply_order_stats(
+                session, user.id, len(created_orders), Counter(), after, product_orders
+            )
+            await bump_user_version(session, user.id)
+        await session.commit()
+        pin_to_primary(user.id)
+
+    created = sum(1 for result in results if result["ok"])
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
+@requestes_router.get('/me', response_model=List[OrderResponseSchema], response_class=FastJSONResponse)
+async def list_order(
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Lista os pedidos do usuário autenticado.
+
+    Pedidos e itens são lidos como linhas do Core (os itens em uma
+    única consulta adicional) e serializados direto em JSON, sem
+    objetos do ORM nem validação pelo `response_model`.
+
+    A resposta leva um ETag derivado da versão do usuário. Se o
+    cliente enviar o mesmo ETag em `If-None-Match`, a resposta é
+    304 e só a versão é consultada.
+
+    Args:
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplica ou primário).
+        if_none_match (str | None): ETag que o cliente já possui.
+
+    Raises:
+        HTTPException: Se o usuário não tiver pedidos.
+
+    Returns:
+        FastJSONResponse | Response: Pedidos do usuário, ou 304.
+    """
+    # A versão é lida antes dos pedidos: se uma escrita acontecer entre
+    # as duas consultas, o ETag fica mais antigo que o corpo, nunca o contrário
+    version = await user_version(session, user.id)
+    etag = make_etag("orders", user.id, version) if version is not None else None
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    result = await session.execute(
+        select(*ORDER_COLUMNS)
+        .where(Order.user_id == user.id)
+        .order_by(Order.id)
+    )
+    orders = [dict(row) for row in result.mappings()]
 
     if not orders:
         raise HTTPException(status_code=404, detail="Nenhum pedido encontrado")
 
-    return orders
+    headers = cache_headers(etag) if etag is not None else None
+    return FastJSONResponse(await attach_items(session, orders), headers=headers)
+
+
+@requestes_router.get('/me/summary', response_model=OrderSummarySchema)
+async def order_summary(user: Principal = Depends(verify_token), session: AsyncSession = Depends(get_read_session)):
+    """
+    Retorna os totais de pedidos do usuário autenticado.
+
+    Os valores vêm das tabelas de agregados, mantidas a cada escrita
+    em pedidos, sem percorrer orders/order_items.
 
+    Args:
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplica ou primário).
 
-@requestes_router.get('orders')
-async def list_orders(user: User = Depends(verify_token), session: Session = Depends(get_session), limit: int = 10, offset: int = 0):
+    Returns:
+        dict: Total de pedidos, de itens e totais por produto.
+    """
+    totals = await session.get(UserOrderStats, user.id)
+    result = await session.execute(
+        select(UserProductStats.product_id, UserProductStats.orders, UserProductStats.qty)
+        .where(UserProductStats.user_id == user.id, UserProductStats.orders > 0)
+        .order_by(UserProductStats.product_id)
+    )
+
+    return {
+        "orders": totals.orders if totals else 0,
+        "items": totals.items if totals else 0,
+        "products": [row._asdict() for row in result],
+    }
+
+
+@requestes_router.get('/orders', response_model=OrderPageSchema, response_class=FastJSONResponse)
+async def list_orders(
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_read_session),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None
+):
     """
     Lista pedidos do sistema (apenas administradores).
 
+    A paginação é por cursor, em ordem de ID, então páginas
+    profundas custam o mesmo que a primeira. Como em `list_order`,
+    a resposta é montada a partir de linhas do Core.
+
     Args:
-        user (User): Usuário autenticado.
-        session (Session): Sessão do banco.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplica ou primário).
         limit (int): Quantidade máxima de registros.
-        offset (int): Deslocamento para paginação.
+        cursor (str | None): `next_cursor` da página anterior.
+
+    Raises:
+        HTTPException: Caso o usuário não seja administrador ou o cursor seja inválido.
+
+    Returns:
+        FastJSONResponse: Pedidos da página e `next_cursor` (None na última página).
+    """
+    if not user.admin:
+        raise HTTPException(status_code=403, detail='Você não tem autorização para fazer essa operação!')
+
+    orders, next_cursor = await keyset_rows(
+        session, select(*ORDER_COLUMNS), Order.id, cursor, limit, "id"
+    )
+    await attach_items(session, orders)
+    return FastJSONResponse({"items": orders, "next_cursor": next_cursor})
+
+
+EXPORT_COLUMNS = ("order_id", "user_id", "total_cents", "product_id", "qty", "size_id", "addon_id")
+
+
+async def stream_order_rows(session_factory):
+    """
+    Percorre todos os pedidos e itens com um cursor no servidor.
+
+    Abre a própria sessão, pois a resposta continua sendo enviada
+    depois que as dependências da requisição já foram encerradas.
+    As linhas chegam em lotes de `EXPORT_BATCH_SIZE`, ordenadas por
+    pedido, sem passar pelo identity map do ORM.
+
+    Args:
+        session_factory (Callable[[], AsyncSession]): Onde abrir a sessão
+            (ver `read_session_factory`).
+
+    Yields:
+        Row: Linha com as colunas de `EXPORT_COLUMNS`.
+    """
+    stmt = (
+        select(
+            Order.id.label("order_id"),
+            Order.user_id,
+            Order.total_cents,
+            OrderItem.product_id,
+            OrderItem.qty,
+            OrderItem.size_id,
+            OrderItem.addon_id,
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.id, OrderItem.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async with session_factory() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
+
+
+async def export_ndjson(session_factory):
+    """Gera um objeto JSON por pedido, com seus itens, um por linha."""
+    current = None
+    buffer = []
+    async for row in stream_order_rows(session_factory):
+        if current is None or current["order_id"] != row.order_id:
+            if current is not None:
+                buffer.append(json.dumps(current, separators=(",", ":")))
+            current = {
+                "order_id": row.order_id,
+                "user_id": row.user_id,
+                "total_cents": row.total_cents,
+                "items": [],
+            }
+            if len(buffer) >= EXPORT_BATCH_SIZE:
+                yield "\n".join(buffer) + "\n"
+                buffer = []
+        if row.product_id is not None:
+            current["items"].append({
+                "product_id": row.product_id,
+                "qty": row.qty,
+                "size_id": row.size_id,
+                "addon_id": row.addon_id,
+            })
+
+    if current is not None:
+        buffer.append(json.dumps(current, separators=(",", ":")))
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+async def export_csv(session_factory):
+    """Gera um CSV com uma linha por item (pedidos sem itens ficam com colunas vazias)."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate(0)
+
+    rows = 0
+    async for row in stream_order_rows(session_factory):
+        writer.writerow(row)
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    yield output.getvalue()
+
+
+@requestes_router.get('/export')
+async def export_orders(
+    user: Principal = Depends(verify_token),
+    format: Literal["ndjson", "csv"] = "ndjson"
+):
+    """
+    Exporta todos os pedidos e itens (apenas administradores).
+
+    A resposta é enviada em streaming enquanto as linhas são lidas
+    do banco (de uma réplica, se houver), com memória constante
+    independente do volume.
+
+    Args:
+        user (Principal): Usuário autenticado.
+        format (str): "ndjson" (um pedido por linha) ou "csv" (um item por linha).
 
     Raises:
         HTTPException: Caso o usuário não seja administrador.
 
     Returns:
-        list[Order]: Lista de pedidos.
+        StreamingResponse: Conteúdo exportado.
     """
     if not user.admin:
         raise HTTPException(status_code=403, detail='Você não tem autorização para fazer essa operação!')
 
-    orders = session.query(Order)\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    session_factory = read_session_factory(user.id)
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(session_factory),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'}
+        )
+    return StreamingResponse(export_ndjson(session_factory), media_type="application/x-ndjson")
+
+
+def item_key(item) -> tuple:
+    """Identidade de uma linha do pedido: produto, tamanho e adicional."""
+    return (item.product_id, item.size_id, item.addon_id)
+
+
+def diff_order_items(current, desired) -> tuple:
+    """
+    Compara os itens gravados com a lista desejada.
+
+    Linhas com o mesmo produto, tamanho e adicional são a mesma linha:
+    na lista desejada suas quantidades são somadas, e no banco as
+    duplicadas além da primeira são removidas.
 
-    return orders
+    Args:
+        current (list[OrderItem]): Itens atualmente gravados.
+        desired (list[CatalogItem]): Itens desejados, já validados.
+
+    Returns:
+        tuple[list[dict], list[dict], list[int]]:
+            Linhas a inserir, atualizações (`id`, `qty`) e IDs a remover.
+    """
+    wanted = Counter()
+    for item in desired:
+        wanted[item_key(item)] += item.qty
+
+    existing = {}
+    to_delete = []
+    for item in current:
+        key = item_key(item)
+        if key in existing or key not in wanted:
+            to_delete.append(item.id)
+        else:
+            existing[key] = item
+
+    to_update = [
+        {"id": item.id, "qty": wanted[key]}
+        for key, item in existing.items()
+        if item.qty != wanted[key]
+    ]
+    to_insert = [
+        {"product_id": key[0], "size_id": key[1], "addon_id": key[2], "qty": qty}
+        for key, qty in wanted.items()
+        if key not in existing
+    ]
+    return to_insert, to_update, to_delete
 
 
 @requestes_router.put('/{order_id}')
-async def update_order(order_id: int, order_i: OrderItemCreateSchema, user: User = Depends(verify_token), session: Session = Depends(get_session)):
+async def update_order(
+    order_id: int,
+    order_schema: OrderCreateSchema,
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_async_session)
+):
     """
-    Atualiza um pedido existente.
+    Substitui os itens de um pedido existente.
+
+    Recebe a lista completa de itens desejada e grava apenas a
+    diferença em relação ao que está no banco: um INSERT, um UPDATE
+    e um DELETE em lote, cada um só quando necessário.
 
     Args:
         order_id (int): ID do pedido.
-        order_schema (OrderSchema): Novos dados do pedido.
-        user (User): Usuário autenticado.
-        session (Session): Sessão do banco.
+        order_schema (OrderCreateSchema): Lista completa de itens do pedido.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão do banco.
 
     Raises:
-        HTTPException: Se o pedido não existir ou o usuário não tiver permissão.
+        HTTPException: Se o pedido não existir, estiver vazio, tiver itens fora
+            do catálogo ou o usuário não tiver permissão.
 
     Returns:
-        dict: Mensagem de sucesso.
+        dict: Mensagem de sucesso e quantidade de linhas inseridas, alteradas e removidas.
     """
-    order = session.query(Order).filter(Order.id == order_id).first()
+    if not order_schema.items:
+        raise HTTPException(status_code=400, detail='Pedido sem itens')
+
+    items = validate_order_items(order_schema.items)
+
+    order = await session.get(Order, order_id, options=[selectinload(Order.items)])
 
     if not order:
         raise HTTPException(status_code=400, detail='Pedido não encontrado')
@@ -119,28 +664,52 @@ async def update_order(order_id: int, order_i: OrderItemCreateSchema, user: User
     if not user.admin and order.user_id != user.id:
         raise HTTPException(status_code=403, detail='Você não tem autorização para fazer essa operação!')
 
-    order.user_id = order.user_id
-    order.item = order_i.item
-    order.quantity = order_i.quantity
-    order.price = order_i.price
+    to_insert, to_update, to_delete = diff_order_items(order.items, items)
 
-    session.commit()
-    session.refresh(order)
+    if to_delete:
+        await session.execute(
+            delete(OrderItem)
+            .where(OrderItem.id.in_(to_delete))
+            .execution_options(synchronize_session=False)
+        )
+    if to_update:
+        await session.execute(
+            update(OrderItem).execution_options(synchronize_session=False),
+            to_update
+        )
+    if to_insert:
+        await session.execute(
+            insert(OrderItem),
+            [dict(row, order_id=order.id) for row in to_insert]
+        )
+
+    if order.user_id is not None:
+        await apply_order_stats(
+            session, order.user_id, 0,
+            product_totals(order.items), product_totals(items)
+        )
+        await bump_user_version(session, order.user_id)
+    order.total_cents = order_total(items)
+    await session.commit()
+    pin_to_primary(user.id)
 
     return {
-        "message": "Pedido atualizado com sucesso!"
+        "message": "Pedido atualizado com sucesso!",
+        "inserted": len(to_insert),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
     }
 
 
 @requestes_router.delete('/{order_id}')
-async def delete_order(order_id: int, user: User = Depends(verify_token), session: Session = Depends(get_session)):
+async def delete_order(order_id: int, user: Principal = Depends(verify_token), session: AsyncSession = Depends(get_async_session)):
     """
     Remove um pedido do sistema.
 
     Args:
         order_id (int): ID do pedido.
-        user (User): Usuário autenticado.
-        session (Session): Sessão do banco.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão do banco.
 
     Raises:
         HTTPException: Se o pedido não existir ou o usuário não tiver autorização.
@@ -148,7 +717,8 @@ async def delete_order(order_id: int, user: User = Depends(verify_token), sessio
     Returns:
         dict: Mensagem de confirmação.
     """
-    order = session.query(Order).filter(Order.id == order_id).first()
+    result = await session.execute(select(Order.user_id).where(Order.id == order_id))
+    order = result.first()
 
     if not order:
         raise HTTPException(status_code=400, detail='Pedido não encontrado')
@@ -159,7 +729,18 @@ async def delete_order(order_id: int, user: User = Depends(verify_token), sessio
             detail='Você não tem autorização para fazer essa operação!'
         )
 
-    session.delete(order)
-    session.commit()
+    if order.user_id is not None:
+        items = await session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.qty).label("qty"))
+            .where(OrderItem.order_id == order_id)
+            .group_by(OrderItem.product_id)
+        )
+        await apply_order_stats(session, order.user_id, -1, product_totals(items), Counter())
+        await bump_user_version(session, order.user_id)
+
+    # Os itens são removidos pelo ON DELETE CASCADE do banco
+    await session.execute(delete(Order).where(Order.id == order_id))
+    await session.commit()
+    pin_to_primary(user.id)
 
     return {'message': 'Pedido deletado com sucesso!'}
@@ -1,8 +1,55 @@
+import asyncio
 from fastapi import Depends, HTTPException
-from ..Database.database import db, Token
-from sqlalchemy.orm import sessionmaker, Session
+from ..Database.database import SessionLocal, AsyncSessionLocal, ReplicaSessionLocal, Token, RevokedToken, User, utcnow
+from sqlalchemy import select, insert, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-from ..config import oauth2_schema
+from ..cache import TTLCache
+from ..security import decode_token, token_digest, TokenDenylist
+from ..config import (
+    oauth2_schema,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL_SECONDS,
+    AUTH_MODE,
+    DENYLIST_REFRESH_SECONDS,
+    DATABASE_REPLICA_URLS,
+    READ_AFTER_WRITE_SECONDS,
+    READ_AFTER_WRITE_MAX_USERS,
+)
+
+
+class Principal:
+    """
+    Usuário autenticado, resolvido a partir do token.
+
+    Objeto leve (sem sessão do SQLAlchemy) que carrega só o necessário
+    para autorização e para respostas simples. Rotas que precisam da
+    linha completa de `User` devem depender de `get_current_user`.
+
+    No modo `AUTH_MODE=jwt`, `name`, `email` e `ativo` não estão
+    disponíveis nas claims e ficam como None.
+    """
+
+    __slots__ = ("id", "name", "email", "admin", "ativo", "expires_at")
+
+    def __init__(self, id, name, email, admin, ativo, expires_at):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.admin = admin
+        self.ativo = ativo
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"Principal(id={self.id!r}, admin={self.admin!r})"
+
+
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+token_denylist = TokenDenylist(refresh_seconds=DENYLIST_REFRESH_SECONDS)
+# Uma única recarga da denylist por vez; as demais requisições aguardam o resultado
+denylist_refresh_lock = asyncio.Lock()
+# Usuários que escreveram há menos de READ_AFTER_WRITE_SECONDS (leem do primário)
+primary_pins = TTLCache(maxsize=READ_AFTER_WRITE_MAX_USERS, ttl=READ_AFTER_WRITE_SECONDS)
 
 
 def get_session():
@@ -16,17 +63,62 @@ def get_session():
     Yields:
         Session: Sessão ativa do SQLAlchemy.
     """
+    session = SessionLocal()
     try:
-        SessionLocal = sessionmaker(bind=db)
-        session = SessionLocal()
         yield session
     finally:
         session.close()
 
 
-def verify_token(
+async def get_async_session():
+    """
+    Fornece uma sessão assíncrona do banco de dados.
+
+    Usada pelos routers para que as consultas não bloqueiem o
+    event loop. Os objetos não expiram no commit, evitando
+    recargas implícitas (que não são permitidas no modo assíncrono).
+
+    Yields:
+        AsyncSession: Sessão assíncrona do SQLAlchemy.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def pin_to_primary(user_id: int):
+    """
+    Direciona as leituras do usuário ao primário por um curto período.
+
+    Deve ser chamada após cada escrita confirmada, para que o usuário
+    veja a própria escrita mesmo que as réplicas estejam atrasadas.
+    O registro é local ao processo.
+
+    Args:
+        user_id (int): Usuário que acabou de escrever.
+    """
+    if DATABASE_REPLICA_URLS:
+        primary_pins.set(user_id, True)
+
+
+def read_session_factory(user_id: int):
+    """
+    Escolhe onde abrir as sessões de leitura de um usuário.
+
+    Args:
+        user_id (int): Usuário autenticado.
+
+    Returns:
+        Callable[[], AsyncSession]: `AsyncSessionLocal` se o usuário
+            escreveu recentemente, senão `ReplicaSessionLocal`.
+    """
+    if primary_pins.get(user_id):
+        return AsyncSessionLocal
+    return ReplicaSessionLocal
+
+
+async def verify_token(
     token: str = Depends(oauth2_schema),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Valida um token de autenticação.
@@ -37,23 +129,206 @@ def verify_token(
     - Está ativo
     - Não está expirado
 
+    Tokens válidos ficam em cache por até `TOKEN_CACHE_TTL_SECONDS`,
+    nunca além do seu `expires_at`, evitando a consulta ao banco
+    em requisições repetidas.
+
+    Com `AUTH_MODE=jwt` a validação é feita localmente pela
+    assinatura, ver `verify_token_stateless`.
+
     Args:
         token (str): Token JWT extraído da requisição.
-        db (Session): Sessão ativa do banco de dados.
+        db (AsyncSession): Sessão ativa do banco de dados.
 
     Raises:
         HTTPException: Caso o token seja inválido ou expirado.
 
     Returns:
-        User: Usuário associado ao token válido.
+        Principal: Dados do usuário associado ao token válido.
+    """
+    if AUTH_MODE == "jwt":
+        return await verify_token_stateless(token, db)
+
+    token_hash = token_digest(token)
+    principal = token_cache.get(token_hash)
+    if principal is not None:
+        return principal
+
+    principal = await load_principal(db, token_hash)
+
+    if not principal:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+    token_cache.set(token_hash, principal, expires_at=principal.expires_at.timestamp())
+    return principal
+
+
+async def get_read_session(user: Principal = Depends(verify_token)):
     """
-    token_db = db.query(Token).filter(
-        Token.token == token,
-        Token.is_active == True,
-        Token.expires_at > datetime.now(timezone.utc)
-    ).first()
+    Fornece uma sessão somente leitura, em uma réplica quando possível.
+
+    As réplicas de `DATABASE_REPLICA_URLS` são usadas em rodízio; o
+    primário é usado quando não há réplicas ou quando o usuário
+    escreveu há pouco (ver `pin_to_primary`).
+
+    Args:
+        user (Principal): Usuário autenticado.
+
+    Yields:
+        AsyncSession: Sessão assíncrona para consultas.
+    """
+    async with read_session_factory(user.id)() as session:
+        yield session
+
+
+async def load_principal(db: AsyncSession, token_hash: str):
+    """
+    Resolve token e usuário em uma única consulta.
+
+    Args:
+        db (AsyncSession): Sessão ativa do banco de dados.
+        token_hash (str): Digest do token, ver `token_digest`.
+
+    Returns:
+        Principal | None: Usuário do token, ou None se o token não
+            existir, estiver inativo ou expirado.
+    """
+    result = await db.execute(
+        select(User.id, User.name, User.email, User.admin, User.ativo, Token.expires_at)
+        .join(Token, Token.user_id == User.id)
+        .where(
+            Token.token_hash == token_hash,
+            Token.is_active == True,
+            Token.expires_at > utcnow()
+        )
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    return Principal(
+        id=row.id,
+        name=row.name,
+        email=row.email,
+        admin=bool(row.admin),
+        ativo=row.ativo,
+        expires_at=row.expires_at.replace(tzinfo=timezone.utc)
+    )
+
+
+async def get_current_user(
+    principal: Principal = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Carrega a linha completa do usuário autenticado.
+
+    Para rotas que alteram o usuário e precisam do objeto ORM.
+
+    Args:
+        principal (Principal): Usuário autenticado.
+        db (AsyncSession): Sessão ativa do banco de dados.
+
+    Raises:
+        HTTPException: Caso o usuário não exista mais.
+
+    Returns:
+        User: Usuário autenticado.
+    """
+    user = await db.get(User, principal.id)
+
+    if not user:
+        raise HTTPException(status_code=404, detail='Usuario não cadastrado')
+
+    return user
+
+
+async def refresh_denylist(db: AsyncSession):
+    """
+    Recarrega a denylist de tokens revogados a partir do banco.
+
+    Apenas tokens inativos e ainda não expirados são carregados,
+    incluindo os de usuários removidos (`revoked_tokens`).
+
+    Args:
+        db (AsyncSession): Sessão ativa do banco de dados.
+    """
+    now = utcnow()
+    result = await db.execute(union_all(
+        select(Token.jti).where(
+            Token.is_active == False,
+            Token.jti.isnot(None),
+            Token.expires_at > now
+        ),
+        select(RevokedToken.jti).where(RevokedToken.expires_at > now),
+    ))
+    token_denylist.replace(result.scalars().all())
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int):
+    """
+    Revoga todos os tokens ainda válidos de um usuário que será removido.
+
+    Os `jti` são copiados para `revoked_tokens`, que não é afetada
+    pelo ON DELETE CASCADE. Deve ser chamada na mesma transação do
+    DELETE do usuário; após o commit, os `jti` retornados devem ser
+    adicionados à `token_denylist` deste processo.
+
+    Args:
+        db (AsyncSession): Sessão da transação da remoção.
+        user_id (int): Usuário que será removido.
+
+    Returns:
+        list[str]: `jti` revogados.
+    """
+    result = await db.execute(
+        select(Token.jti, Token.expires_at).where(
+            Token.user_id == user_id,
+            Token.jti.isnot(None),
+            Token.expires_at > utcnow()
+        )
+    )
+    rows = [{"jti": jti, "expires_at": expires_at} for jti, expires_at in result]
+    if rows:
+        await db.execute(insert(RevokedToken), rows)
+    return [row["jti"] for row in rows]
+
+
+async def verify_token_stateless(token: str, db: AsyncSession):
+    """
+    Valida um token sem consultar a tabela tokens.
+
+    A assinatura e a expiração são verificadas localmente e o `jti`
+    é comparado com a denylist em memória. O banco só é consultado
+    quando a denylist precisa ser recarregada, e por uma única
+    requisição de cada vez.
+
+    Args:
+        token (str): Token JWT extraído da requisição.
+        db (AsyncSession): Sessão usada apenas para recarregar a denylist.
+
+    Raises:
+        HTTPException: Caso o token seja inválido, expirado ou revogado.
+
+    Returns:
+        Principal: Dados do usuário presentes nas claims do token.
+    """
+    claims = decode_token(token)
+
+    if token_denylist.is_stale():
+        async with denylist_refresh_lock:
+            # Outra requisição pode ter recarregado enquanto esta aguardava
+            if token_denylist.is_stale():
+                await refresh_denylist(db)
 
-    if not token_db:
+    if claims["jti"] in token_denylist:
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    return token_db.user
+    return Principal(
+        id=int(claims["sub"]),
+        name=None,
+        email=None,
+        admin=bool(claims.get("adm", False)),
+        ativo=None,
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    )
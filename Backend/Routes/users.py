@@ -1,9 +1,24 @@
-import bcrypt
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..Database.database import User, Local
-from ..schemas import SignupSchema, UserSchema, ChangeSchema, DeleteSchema, UserResponseSchema, UserLocalSchema
-from ..Routes.resources import get_session, verify_token
+from ..schemas import SignupSchema, UserSchema, ChangeSchema, DeleteSchema, UserResponseSchema, UserLocalSchema, UserPageSchema
+from ..pagination import keyset_rows
+from ..serialization import FastJSONResponse, USER_COLUMNS
+from ..Routes.resources import (
+    get_async_session,
+    get_read_session,
+    verify_token,
+    get_current_user,
+    pin_to_primary,
+    revoke_user_tokens,
+    token_cache,
+    token_denylist,
+    Principal,
+)
+from ..security import password_hasher
+from ..etag import bump_user_version, user_version, make_etag, etag_matches, cache_headers, not_modified
 from sqlalchemy.exc import IntegrityError
 
 users_router = APIRouter(prefix='/users', tags=['Users'])
@@ -12,21 +27,18 @@ users_router = APIRouter(prefix='/users', tags=['Users'])
 
 @users_router.post('', response_model=UserResponseSchema)
 async def signup(data: SignupSchema,
-                 session: Session = Depends(get_session)):
+                 session: AsyncSession = Depends(get_async_session)):
 
     schema_user = data.schema_user
     schema_local = data.schema_local
 
-    email = session.query(User).filter(User.email == schema_user.email).first()
+    result = await session.execute(select(User).where(User.email == schema_user.email))
+    email = result.scalars().first()
 
     if email:
         raise HTTPException(status_code=400, detail="Email já cadastrado!")
 
-    senha_str = schema_user.senha.get_secret_value()
-    hash_senha = bcrypt.hashpw(
-        senha_str.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
+    hash_senha = await password_hasher.hash(schema_user.senha.get_secret_value())
     try:
         new_user = User(
             name=schema_user.name,
@@ -37,9 +49,6 @@ async def signup(data: SignupSchema,
             admin=schema_user.admin,
         )
 
-        session.add(new_user)
-        session.flush()
-
         new_userlocal = Local(
             cep=schema_local.cep,
             city=schema_local.city,
@@ -50,59 +59,98 @@ async def signup(data: SignupSchema,
         )
 
         new_user.locals.append(new_userlocal)  # <- melhor que new_userlocal.user = new_user
-        session.commit()
-        session.refresh(new_user)
+        session.add(new_user)
+        await session.commit()
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Erro ao criar usuário. Verifique os dados e tente novamente.")
+    pin_to_primary(new_user.id)
     return new_user
 
-@users_router.get('', response_model=list[UserResponseSchema])
+@users_router.get('', response_model=UserPageSchema, response_class=FastJSONResponse)
 async def all_users(
-    user: User = Depends(verify_token),
-    session: Session = Depends(get_session),
-    limit: int = Query(1, ge=1),
-    offset: int = Query(0, ge=0)
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_read_session),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
     """
     Lista usuários cadastrados.
 
     Apenas usuários administradores podem acessar este endpoint.
+    A paginação é por cursor, em ordem de ID. Só as colunas da
+    resposta são lidas, como linhas do Core serializadas direto em JSON.
 
     Args:
-        user (User): Usuário autenticado.
-        session (Session): Sessão ativa do banco.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplica ou primário).
         limit (int): Quantidade máxima de registros retornados.
-        offset (int): Deslocamento para paginação (não utilizado na query atual).
+        cursor (str | None): `next_cursor` da página anterior.
 
     Raises:
-        HTTPException: Caso o usuário não seja administrador.
+        HTTPException: Caso o usuário não seja administrador ou o cursor seja inválido.
 
     Returns:
-        list[User]: Lista de usuários.
+        FastJSONResponse: Usuários da página e `next_cursor` (None na última página).
     """
     if not user.admin:
         raise HTTPException(
             status_code=403,
             detail='Você não tem autorização para fazer essa operação'
         )
-    users = session.query(User)\
-        .limit(limit)\
-        .all()
-    return users
+    users, next_cursor = await keyset_rows(session, select(*USER_COLUMNS), User.id, cursor, limit, "id")
+    return FastJSONResponse({"items": users, "next_cursor": next_cursor})
 
 @users_router.get('/me', response_model=UserResponseSchema)
 async def get_user(
-    user: User = Depends(verify_token),
-    session: Session = Depends(get_session)
+    response: Response,
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: Optional[str] = Header(None)
 ):
-    return session.query(User).filter(User.id == user.id).first()
+    """
+    Retorna os dados do usuário autenticado.
+
+    A resposta leva um ETag derivado da versão do usuário. Se o
+    cliente enviar o mesmo ETag em `If-None-Match`, a resposta é
+    304 e só a versão é consultada; caso contrário os dados e a
+    versão vêm da mesma consulta, para que o ETag corresponda ao
+    corpo (os dados do token em cache podem estar defasados).
+
+    Args:
+        response (Response): Resposta, para os headers de cache.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplica ou primário).
+        if_none_match (str | None): ETag que o cliente já possui.
+
+    Raises:
+        HTTPException: Caso o usuário não exista mais.
+
+    Returns:
+        dict | Response: Dados do usuário, ou 304.
+    """
+    if if_none_match:
+        version = await user_version(session, user.id)
+        if version is not None:
+            etag = make_etag("user", user.id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    result = await session.execute(
+        select(User.id, User.name, User.email, User.version).where(User.id == user.id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail='Usuario não cadastrado')
+
+    response.headers.update(cache_headers(make_etag("user", row.id, row.version)))
+    return {"id": row.id, "name": row.name, "email": row.email}
 
 @users_router.put('/me')
 async def change_user(
     schema_user: ChangeSchema,
-    user: User = Depends(verify_token),
-    session: Session = Depends(get_session)
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Atualiza os dados do usuário autenticado.
@@ -112,7 +160,7 @@ async def change_user(
     Args:
         schema_user (ChangeSchema): Novos dados do usuário.
         user (User): Usuário autenticado.
-        session (Session): Sessão ativa do banco.
+        session (AsyncSession): Sessão ativa do banco.
 
     Raises:
         HTTPException: Caso o usuário não exista.
@@ -120,20 +168,15 @@ async def change_user(
     Returns:
         dict: Mensagem de confirmação.
     """
-    user = session.query(User).filter(User.id == user.id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail='Usuario não cadastrado')
-    
     user.name = schema_user.nome
     user.email = schema_user.email
 
-    senha_bytes = schema_user.senha.encode('utf-8')
-    hash_senha = bcrypt.hashpw(senha_bytes, bcrypt.gensalt())
-    user.senha = hash_senha.decode('utf-8')
+    user.senha = await password_hasher.hash(schema_user.senha.get_secret_value())
+    await bump_user_version(session, user.id)
 
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    token_cache.discard_if(lambda principal: principal.id == user.id)
+    pin_to_primary(user.id)
 
     return {"message": "Usuário atualizado com sucesso"}
 
@@ -141,18 +184,22 @@ async def change_user(
 @users_router.delete('/me')
 async def delete_user(
     delete_schema: DeleteSchema,
-    user: User = Depends(verify_token),
-    session: Session = Depends(get_session)
+    user: Principal = Depends(verify_token),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Remove o usuário autenticado do sistema.
 
     Exige confirmação explícita para evitar exclusões acidentais.
+    Tokens, pedidos, itens e endereços são removidos pelo
+    ON DELETE CASCADE do banco, em um único DELETE. Antes disso os
+    tokens ainda válidos são copiados para `revoked_tokens`, para que
+    continuem recusados no modo `AUTH_MODE=jwt`.
 
     Args:
         delete_schema (DeleteSchema): Dados de confirmação.
-        user (User): Usuário autenticado.
-        session (Session): Sessão ativa do banco.
+        user (Principal): Usuário autenticado.
+        session (AsyncSession): Sessão ativa do banco.
 
     Raises:
         HTTPException: Caso o usuário não exista ou confirmação seja falsa.
@@ -160,14 +207,17 @@ async def delete_user(
     Returns:
         dict: Mensagem de sucesso.
     """
-    user = session.query(User).filter(User.id == user.id).first()
+    if delete_schema.confirm != True:
+        raise HTTPException(status_code=400, detail='Confirme para deletar o usuário!')
 
-    if not user:
+    # Com AUTH_MODE=jwt os tokens continuariam válidos até expirar
+    revoked = await revoke_user_tokens(session, user.id)
+    result = await session.execute(delete(User).where(User.id == user.id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail='Usuario não cadastrado')
 
-    if delete_schema.confirm == True:
-        session.delete(user)
-        session.commit()
-        return {"message": "Usuário deletado com sucesso"}
-    else:
-        raise HTTPException(status_code=400, detail='Confirme para deletar o usuário!')
+    await session.commit()
+    token_cache.discard_if(lambda principal: principal.id == user.id)
+    for jti in revoked:
+        token_denylist.add(jti)
+    return {"message": "Usuário deletado com sucesso"}
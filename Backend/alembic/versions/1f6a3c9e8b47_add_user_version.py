@@ -0,0 +1,28 @@
+"""add user version
+
+Revision ID: 1f6a3c9e8b47
+Revises: e5b94d7a2c68
+Create Date: 2026-10-18 16:40:27.905613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6a3c9e8b47'
+down_revision: Union[str, Sequence[str], None] = 'e5b94d7a2c68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'version')
@@ -0,0 +1,28 @@
+"""add token remember
+
+Revision ID: 4e8b1d6c3f92
+Revises: f27a90c4e6b8
+Create Date: 2026-10-18 11:20:03.772145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8b1d6c3f92'
+down_revision: Union[str, Sequence[str], None] = 'f27a90c4e6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tokens', sa.Column('remember', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tokens', 'remember')
@@ -0,0 +1,60 @@
+"""fk indexes and on delete cascade
+
+Revision ID: 6d2c8a4b91e0
+Revises: a93f5e27c1d4
+Create Date: 2026-10-18 14:12:30.940517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2c8a4b91e0'
+down_revision: Union[str, Sequence[str], None] = 'a93f5e27c1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (tabela, coluna, tabela referenciada)
+FOREIGN_KEYS = [
+    ('locals', 'user_id', 'users'),
+    ('tokens', 'user_id', 'users'),
+    ('orders', 'user_id', 'users'),
+    ('order_items', 'order_id', 'orders'),
+]
+
+# tokens.user_id já foi indexado em 8c5d2f0e7a31
+INDEXES = [
+    ('locals', 'user_id'),
+    ('orders', 'user_id'),
+    ('order_items', 'order_id'),
+]
+
+
+def _replace_foreign_keys(ondelete) -> None:
+    """Recria a FK de cada coluna (removendo duplicadas de migrações antigas)."""
+    inspector = sa.inspect(op.get_bind())
+    for table, column, referred in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] == [column] and fk['name']:
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+        op.create_foreign_key(
+            f'{table}_{column}_fkey', table, referred, [column], ['id'], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_keys(None)
+    for table, column in reversed(INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
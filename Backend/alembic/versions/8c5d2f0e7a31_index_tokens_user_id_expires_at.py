@@ -0,0 +1,32 @@
+"""index tokens user_id and expires_at
+
+Revision ID: 8c5d2f0e7a31
+Revises: b41e7c2a9d15
+Create Date: 2026-10-18 10:02:11.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5d2f0e7a31'
+down_revision: Union[str, Sequence[str], None] = 'b41e7c2a9d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # verify_token e logout usam a chave primária (token);
+    # expires_at atende o reaper e a denylist, user_id a FK.
+    op.create_index(op.f('ix_tokens_user_id'), 'tokens', ['user_id'], unique=False)
+    op.create_index(op.f('ix_tokens_expires_at'), 'tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tokens_expires_at'), table_name='tokens')
+    op.drop_index(op.f('ix_tokens_user_id'), table_name='tokens')
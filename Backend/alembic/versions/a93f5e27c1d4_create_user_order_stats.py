@@ -0,0 +1,66 @@
+"""create user order stats
+
+Revision ID: a93f5e27c1d4
+Revises: 4e8b1d6c3f92
+Create Date: 2026-10-18 13:05:48.661032
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93f5e27c1d4'
+down_revision: Union[str, Sequence[str], None] = '4e8b1d6c3f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_order_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_product_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'product_id')
+    )
+
+    # Preenche os agregados com os pedidos já existentes
+    op.execute("""
+        INSERT INTO user_order_stats (user_id, orders, items)
+        SELECT o.user_id,
+               COUNT(DISTINCT o.id),
+               COALESCE(SUM(i.qty), 0)
+        FROM orders o
+        LEFT JOIN order_items i ON i.order_id = o.id
+        WHERE o.user_id IS NOT NULL
+        GROUP BY o.user_id
+    """)
+    op.execute("""
+        INSERT INTO user_product_stats (user_id, product_id, orders, qty)
+        SELECT o.user_id,
+               i.product_id,
+               COUNT(DISTINCT o.id),
+               SUM(i.qty)
+        FROM orders o
+        JOIN order_items i ON i.order_id = o.id
+        WHERE o.user_id IS NOT NULL AND i.product_id IS NOT NULL
+        GROUP BY o.user_id, i.product_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_product_stats')
+    op.drop_table('user_order_stats')
@@ -0,0 +1,30 @@
+"""add token jti
+
+Revision ID: b41e7c2a9d15
+Revises: 03c3712f2a7d
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7c2a9d15'
+down_revision: Union[str, Sequence[str], None] = '03c3712f2a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tokens', sa.Column('jti', sa.String(length=32), nullable=True))
+    op.create_unique_constraint('uq_tokens_jti', 'tokens', ['jti'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_tokens_jti', 'tokens', type_='unique')
+    op.drop_column('tokens', 'jti')
@@ -0,0 +1,28 @@
+"""add order total
+
+Revision ID: e5b94d7a2c68
+Revises: c7e3a1f85b26
+Create Date: 2026-10-18 16:02:44.158302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b94d7a2c68'
+down_revision: Union[str, Sequence[str], None] = 'c7e3a1f85b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('total_cents', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'total_cents')
@@ -0,0 +1,57 @@
+"""store token digest instead of raw token
+
+Revision ID: f27a90c4e6b8
+Revises: 8c5d2f0e7a31
+Create Date: 2026-10-18 10:41:57.204388
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27a90c4e6b8'
+down_revision: Union[str, Sequence[str], None] = '8c5d2f0e7a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    op.add_column('tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE tokens SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+        )
+    else:
+        tokens = sa.table('tokens', sa.column('token', sa.String), sa.column('token_hash', sa.String))
+        for (token,) in bind.execute(sa.select(tokens.c.token)).fetchall():
+            bind.execute(
+                tokens.update()
+                .where(tokens.c.token == token)
+                .values(token_hash=hashlib.sha256(token.encode('utf-8')).hexdigest())
+            )
+
+    pk_name = sa.inspect(bind).get_pk_constraint('tokens')['name'] or 'tokens_pkey'
+    with op.batch_alter_table('tokens') as batch_op:
+        batch_op.drop_constraint(pk_name, type_='primary')
+        batch_op.drop_column('token')
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_primary_key('tokens_pkey', ['token_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Os tokens originais não podem ser recuperados a partir do digest:
+    # as sessões existentes são descartadas e os usuários fazem login de novo.
+    op.execute("DELETE FROM tokens")
+    with op.batch_alter_table('tokens') as batch_op:
+        batch_op.drop_constraint('tokens_pkey', type_='primary')
+        batch_op.drop_column('token_hash')
+        batch_op.add_column(sa.Column('token', sa.String(length=200), nullable=False))
+        batch_op.create_primary_key('tokens_pkey', ['token'])
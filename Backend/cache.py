@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por entrada e descarte LRU.
+
+    Cada entrada expira no menor valor entre o TTL padrão do cache
+    e o instante informado em `expires_at`. Quando o limite de
+    entradas é atingido, a entrada usada há mais tempo é descartada.
+
+    O cache é local ao processo e seguro para uso entre threads.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Busca uma entrada válida no cache.
+
+        Args:
+            key: Chave da entrada.
+
+        Returns:
+            object | None: Valor armazenado ou None se ausente/expirado.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, deadline = entry
+            if deadline <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at: float | None = None):
+        """
+        Armazena uma entrada no cache.
+
+        Args:
+            key: Chave da entrada.
+            value: Valor a ser armazenado.
+            expires_at (float | None): Timestamp UNIX após o qual a
+                entrada nunca deve ser servida.
+        """
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+
+        deadline = time.monotonic() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, time.monotonic() + (expires_at - time.time()))
+            if deadline <= time.monotonic():
+                return
+
+        with self._lock:
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove imediatamente uma entrada do cache.
+
+        Args:
+            key: Chave da entrada.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_if(self, predicate):
+        """
+        Remove as entradas cujo valor satisfaz o predicado.
+
+        Percorre todo o cache; destinado a operações raras, como a
+        alteração ou remoção de um usuário.
+
+        Args:
+            predicate (Callable[[object], bool]): Função aplicada a cada valor.
+        """
+        with self._lock:
+            for key in [k for k, (value, _) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: Acertos, falhas, tamanho atual e limite.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from fastapi import HTTPException
+from .config import CATALOG_PATH, CATALOG_RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Size(NamedTuple):
+    id: str
+    name: str
+    price_cents: int
+
+
+class Addon(NamedTuple):
+    id: str
+    name: str
+    price_cents: int
+
+
+class Product(NamedTuple):
+    id: str
+    name: str
+    price_cents: int
+    sizes: frozenset
+    addons: frozenset
+    default_size: Optional[str]
+
+
+class CatalogItem(NamedTuple):
+    """Item de pedido validado e completado a partir do catálogo."""
+    product_id: str
+    qty: int
+    size_id: Optional[str]
+    addon_id: Optional[str]
+    product: Product
+    size: Optional[Size]
+    addon: Optional[Addon]
+
+
+class Catalog:
+    """
+    Catálogo de produtos, tamanhos e adicionais, imutável após carregado.
+
+    As buscas são feitas em dicionários somente leitura, sem acesso
+    ao banco. Para trocar o catálogo, um novo objeto é criado e
+    substitui o anterior por inteiro.
+    """
+
+    def __init__(self, products: dict, sizes: dict, addons: dict):
+        self.products = MappingProxyType(products)
+        self.sizes = MappingProxyType(sizes)
+        self.addons = MappingProxyType(addons)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Catalog":
+        """
+        Monta o catálogo a partir do conteúdo do arquivo JSON.
+
+        Args:
+            data (dict): Listas `products`, `sizes` e `addons`.
+
+        Raises:
+            ValueError: Caso algum produto referencie tamanho ou adicional inexistente.
+
+        Returns:
+            Catalog: Catálogo carregado.
+        """
+        sizes = {s["id"]: Size(s["id"], s["name"], int(s.get("price_cents", 0))) for s in data.get("sizes", [])}
+        addons = {a["id"]: Addon(a["id"], a["name"], int(a.get("price_cents", 0))) for a in data.get("addons", [])}
+
+        products = {}
+        for p in data.get("products", []):
+            product = Product(
+                id=p["id"],
+                name=p["name"],
+                price_cents=int(p.get("price_cents", 0)),
+                sizes=frozenset(p.get("sizes", [])),
+                addons=frozenset(p.get("addons", [])),
+                default_size=p.get("default_size"),
+            )
+            unknown = (product.sizes - sizes.keys()) | (product.addons - addons.keys())
+            if product.default_size is not None and product.default_size not in product.sizes:
+                unknown |= {product.default_size}
+            if unknown:
+                raise ValueError(f"Product '{product.id}' references unknown ids: {sorted(unknown)}")
+            products[product.id] = product
+
+        return cls(products, sizes, addons)
+
+    def resolve(self, item) -> CatalogItem:
+        """
+        Valida um item de pedido e o completa com os dados do catálogo.
+
+        Quando o produto tem tamanhos e nenhum é informado, o tamanho
+        padrão do produto é usado.
+
+        Args:
+            item (OrderItemCreateSchema): Item recebido na requisição.
+
+        Raises:
+            ValueError: Caso o produto, tamanho ou adicional não exista
+                ou não seja permitido para o produto.
+
+        Returns:
+            CatalogItem: Item validado.
+        """
+        product = self.products.get(item.product_id)
+        if product is None:
+            raise ValueError(f"Produto '{item.product_id}' não existe")
+
+        size_id = item.size_id if item.size_id is not None else product.default_size
+        if size_id is not None and size_id not in product.sizes:
+            raise ValueError(f"Tamanho '{size_id}' não disponível para '{product.id}'")
+        if size_id is None and product.sizes:
+            raise ValueError(f"Informe o tamanho de '{product.id}'")
+
+        if item.addon_id is not None and item.addon_id not in product.addons:
+            raise ValueError(f"Adicional '{item.addon_id}' não disponível para '{product.id}'")
+
+        return CatalogItem(
+            product_id=product.id,
+            qty=item.qty,
+            size_id=size_id,
+            addon_id=item.addon_id,
+            product=product,
+            size=self.sizes.get(size_id) if size_id else None,
+            addon=self.addons.get(item.addon_id) if item.addon_id else None,
+        )
+
+    def resolve_items(self, items) -> list:
+        """
+        Valida todos os itens de um pedido.
+
+        Args:
+            items (list[OrderItemCreateSchema]): Itens recebidos.
+
+        Raises:
+            ValueError: Com a lista de problemas encontrados, por posição.
+
+        Returns:
+            list[CatalogItem]: Itens validados, na mesma ordem.
+        """
+        resolved = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                resolved.append(self.resolve(item))
+            except ValueError as exc:
+                errors.append(f"items.{index}: {exc}")
+
+        if errors:
+            raise ValueError("; ".join(errors))
+        return resolved
+
+
+class CatalogStore:
+    """
+    Mantém o catálogo atual e o recarrega quando o arquivo muda.
+
+    A data de modificação do arquivo é verificada no máximo a cada
+    `reload_seconds`. Se o novo conteúdo for inválido, o catálogo
+    anterior continua em uso.
+    """
+
+    def __init__(self, path: str, reload_seconds: float):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._catalog = None
+        self._mtime = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def load(self) -> Catalog:
+        """
+        Lê o arquivo e substitui o catálogo atual.
+
+        Raises:
+            OSError | ValueError: Caso o arquivo não possa ser lido ou seja inválido.
+
+        Returns:
+            Catalog: Catálogo carregado.
+        """
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, encoding="utf-8") as f:
+                catalog = Catalog.from_dict(json.load(f))
+            self._catalog = catalog
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            return catalog
+
+    def get(self) -> Catalog:
+        """
+        Retorna o catálogo atual, recarregando-o se o arquivo mudou.
+
+        Returns:
+            Catalog: Catálogo em uso.
+        """
+        if self._catalog is None:
+            return self.load()
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_seconds:
+            self._checked_at = now
+            try:
+                if os.stat(self.path).st_mtime != self._mtime:
+                    self.load()
+                    logger.info("Catalog reloaded from %s", self.path)
+            except (OSError, ValueError, KeyError):
+                logger.exception("Catalog reload failed, keeping previous version")
+
+        return self._catalog
+
+
+catalog_store = CatalogStore(CATALOG_PATH, CATALOG_RELOAD_SECONDS)
+
+
+def validate_order_items(items) -> list:
+    """
+    Valida os itens de um pedido contra o catálogo, para uso nas rotas.
+
+    Args:
+        items (list[OrderItemCreateSchema]): Itens recebidos.
+
+    Raises:
+        HTTPException: 422 com os problemas encontrados.
+
+    Returns:
+        list[CatalogItem]: Itens validados e completados.
+    """
+    try:
+        return catalog_store.get().resolve_items(items)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
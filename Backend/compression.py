@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+from fastapi import Request, Response
+from .etag import etag_matches
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Verifica se o cliente aceita gzip no header `Accept-Encoding`.
+
+    Args:
+        accept_encoding (str): Valor do header (pode ser vazio).
+
+    Returns:
+        bool: True se gzip (ou `*`) for aceito com q maior que zero.
+    """
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class PrecompressedPage:
+    """
+    Página estática mantida em memória, já comprimida.
+
+    O conteúdo é gerado uma única vez (ex.: template renderizado na
+    inicialização) e servido com ETag e Cache-Control. Como a resposta
+    já sai com `Content-Encoding`, o GZipMiddleware não a comprime de novo.
+    O ETag é fraco, pois é o mesmo para o corpo com e sem gzip.
+    """
+
+    def __init__(self, body: bytes, media_type: str, level: int, max_age: int):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=level)
+        self.media_type = media_type
+        self.etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.cache_control = f"public, max-age={max_age}"
+
+    def response(self, request: Request) -> Response:
+        """
+        Monta a resposta para a requisição, comprimida se o cliente aceitar.
+
+        Args:
+            request (Request): Requisição recebida.
+
+        Returns:
+            Response: 304 se o cliente já tem a página, senão o conteúdo.
+        """
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        if accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzipped, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
@@ -10,9 +10,80 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRES_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRES_MINUTES", "30"))
 
+# Obrigatória, mas só verificada quando o primeiro engine é criado
 DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is not set")
+# Opcional: por padrão é derivada de DATABASE_URL (asyncpg / aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 
+# Pool de conexões (aplicado aos engines síncrono e assíncrono)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# "true": testa a conexão a cada checkout (uma ida ao banco a mais)
+# "false": confia no DB_POOL_RECYCLE para descartar conexões antigas
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Réplicas de leitura, separadas por vírgula (vazio: tudo vai para o primário)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Após uma escrita, as leituras do usuário vão para o primário por este tempo
+READ_AFTER_WRITE_SECONDS = int(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+READ_AFTER_WRITE_MAX_USERS = int(os.getenv("READ_AFTER_WRITE_MAX_USERS", "100000"))
+
+# Cache em memória dos tokens validados (0 desativa)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+# "database": valida cada token na tabela tokens
+# "jwt": valida assinatura/expiração localmente e consulta só a denylist
+AUTH_MODE = os.getenv("AUTH_MODE", "database")
+if AUTH_MODE not in ("database", "jwt"):
+    raise RuntimeError("AUTH_MODE must be 'database' or 'jwt'")
+DENYLIST_REFRESH_SECONDS = int(os.getenv("DENYLIST_REFRESH_SECONDS", "30"))
+
+# Pool dedicado ao bcrypt: threads e limite de operações em espera
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "64"))
+
+# Custo do bcrypt: fixo via BCRYPT_ROUNDS ou calibrado na inicialização
+# para levar cerca de BCRYPT_TARGET_MS por hash, dentro dos limites
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "0")) or None
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "16"))
+
+# Login devolve um token ativo já emitido (mesmo usuário e "remember")
+# se ainda restar pelo menos TOKEN_REUSE_MIN_REMAINING_SECONDS de validade
+TOKEN_REUSE = os.getenv("TOKEN_REUSE", "false").lower() in ("1", "true", "yes")
+TOKEN_REUSE_MIN_REMAINING_SECONDS = int(os.getenv("TOKEN_REUSE_MIN_REMAINING_SECONDS", "600"))
+
+# Quantidade máxima de um item em um pedido (limitada à coluna Integer)
+MAX_ITEM_QTY = min(int(os.getenv("MAX_ITEM_QTY", "1000")), 2**31 - 1)
+
+# Quantidade máxima de pedidos aceitos em POST /requests/batch
+MAX_BATCH_ORDERS = int(os.getenv("MAX_BATCH_ORDERS", "500"))
+
+# Quantidade máxima de carrinhos aceitos em POST /requests/quote
+MAX_QUOTE_CARTS = int(os.getenv("MAX_QUOTE_CARTS", "500"))
+
+# Linhas buscadas por vez no cursor da exportação de pedidos
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Validade das respostas guardadas por Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+# Catálogo de produtos (JSON), recarregado quando o arquivo muda
+CATALOG_PATH = os.getenv("CATALOG_PATH", str(Path(__file__).resolve().parent / "catalog.json"))
+CATALOG_RELOAD_SECONDS = int(os.getenv("CATALOG_RELOAD_SECONDS", "5"))
+
+# Limpeza periódica de tokens expirados/inativos (0 desativa)
+TOKEN_REAPER_INTERVAL_SECONDS = int(os.getenv("TOKEN_REAPER_INTERVAL_SECONDS", "3600"))
+TOKEN_REAPER_BATCH_SIZE = int(os.getenv("TOKEN_REAPER_BATCH_SIZE", "1000"))
+
+# Compressão gzip das respostas (corpos menores que o mínimo vão sem compressão)
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Tempo que navegadores podem reutilizar a página inicial sem revalidar
+HOME_CACHE_SECONDS = int(os.getenv("HOME_CACHE_SECONDS", "300"))
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl="/auth/login-form")
\ No newline at end of file
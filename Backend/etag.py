@@ -0,0 +1,90 @@
+from typing import Optional
+from fastapi import Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .Database.database import User
+
+# Os clientes podem guardar a resposta, mas devem revalidá-la a cada uso
+CACHE_CONTROL = "private, no-cache"
+
+
+async def user_version(session: AsyncSession, user_id: int) -> Optional[int]:
+    """
+    Lê só o contador de versão do usuário.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco.
+        user_id (int): ID do usuário.
+
+    Returns:
+        int | None: Versão atual, ou None se o usuário não existir.
+    """
+    return await session.scalar(select(User.version).where(User.id == user_id))
+
+
+async def bump_user_version(session: AsyncSession, user_id: int):
+    """
+    Incrementa a versão do usuário na transação atual.
+
+    Deve ser chamada por toda escrita que altere o que `/users/me`
+    ou `/requests/me` retornam, antes do commit.
+
+    Args:
+        session (AsyncSession): Sessão da transação da escrita.
+        user_id (int): Usuário cujos dados mudaram.
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def make_etag(scope: str, user_id: int, version: int) -> str:
+    """
+    Monta o ETag fraco de um recurso do usuário.
+
+    É fraco porque o mesmo ETag acompanha o corpo com e sem gzip
+    (o GZipMiddleware comprime as respostas maiores), e um validador
+    forte teria de mudar com a codificação.
+
+    Args:
+        scope (str): Recurso, para que endpoints diferentes não compartilhem ETags.
+        user_id (int): Dono do recurso.
+        version (int): Versão atual do usuário.
+
+    Returns:
+        str: ETag no formato `W/"..."`.
+    """
+    return f'W/"{scope}-{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o header `If-None-Match` contém o ETag atual.
+
+    Args:
+        if_none_match (str | None): Valor do header enviado pelo cliente.
+        etag (str): ETag atual do recurso.
+
+    Returns:
+        bool: True se o cliente já tem a versão atual.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparação fraca: o prefixo W/ é ignorado dos dois lados
+    etag = etag.removeprefix("W/")
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> dict:
+    """Headers de validação enviados junto com o recurso."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Resposta 304, sem corpo, para quando o cliente já tem a versão atual."""
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import IDEMPOTENCY_TTL_SECONDS
+from .Database.database import IdempotencyKey, utcnow
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(payload) -> str:
+    """
+    Gera o digest do corpo da requisição associado a uma chave.
+
+    Args:
+        payload (BaseModel): Corpo já validado.
+
+    Returns:
+        str: SHA-256 hexadecimal do JSON do corpo.
+    """
+    return hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Coordena requisições repetidas com o mesmo `Idempotency-Key`.
+
+    A primeira resposta de cada (usuário, chave) é gravada no banco
+    na mesma transação da escrita, e as repetições recebem essa
+    resposta sem tocar nas tabelas de pedidos. Dentro do processo,
+    requisições simultâneas com a mesma chave esperam a primeira
+    terminar; entre processos, a chave primária da tabela garante
+    que só uma escrita é confirmada.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._locks = {}
+
+    @asynccontextmanager
+    async def in_flight(self, user_id: int, key: str):
+        """
+        Serializa, neste processo, as requisições com a mesma chave.
+
+        Args:
+            user_id (int): Dono da chave.
+            key (str): Valor do header `Idempotency-Key`.
+        """
+        entry = self._locks.get((user_id, key))
+        if entry is None:
+            entry = self._locks[(user_id, key)] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[(user_id, key)]
+
+    async def replay(self, session: AsyncSession, user_id: int, key: str, fingerprint: str):
+        """
+        Busca a resposta gravada para a chave, se ainda válida.
+
+        Args:
+            session (AsyncSession): Sessão ativa do banco.
+            user_id (int): Dono da chave.
+            key (str): Valor do header `Idempotency-Key`.
+            fingerprint (str): Digest do corpo da requisição atual.
+
+        Raises:
+            HTTPException: Caso a chave já tenha sido usada com outro corpo.
+
+        Returns:
+            JSONResponse | None: Resposta original, ou None se não houver.
+        """
+        stored = await session.get(IdempotencyKey, (user_id, key))
+        if stored is None:
+            return None
+
+        if stored.expires_at <= utcnow():
+            await session.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            )
+            await session.commit()
+            return None
+
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key já usada com outro conteúdo")
+
+        return JSONResponse(
+            content=json.loads(stored.body),
+            status_code=stored.status_code,
+            headers={REPLAY_HEADER: "true"}
+        )
+
+    def record(self, session: AsyncSession, user_id: int, key: str, fingerprint: str, status_code: int, body):
+        """
+        Adiciona a resposta à transação atual, para ser confirmada junto com a escrita.
+
+        Args:
+            session (AsyncSession): Sessão da transação da escrita.
+            user_id (int): Dono da chave.
+            key (str): Valor do header `Idempotency-Key`.
+            fingerprint (str): Digest do corpo da requisição.
+            status_code (int): Status HTTP da resposta.
+            body: Corpo da resposta, serializável em JSON.
+        """
+        session.add(IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            status_code=status_code,
+            body=json.dumps(body, separators=(",", ":")),
+            expires_at=utcnow() + timedelta(seconds=self.ttl_seconds)
+        ))
+
+
+idempotency_store = IdempotencyStore(ttl_seconds=IDEMPOTENCY_TTL_SECONDS)
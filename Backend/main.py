@@ -1,9 +1,68 @@
+import asyncio
+from pathlib import Path
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from .config import (
+    TOKEN_REAPER_INTERVAL_SECONDS,
+    TOKEN_REAPER_BATCH_SIZE,
+    BCRYPT_TARGET_MS,
+    BCRYPT_MIN_ROUNDS,
+    BCRYPT_MAX_ROUNDS,
+    GZIP_MINIMUM_SIZE,
+    GZIP_LEVEL,
+    HOME_CACHE_SECONDS,
+)
+from .Database.database import dispose_engines
+from .Database.reaper import run_token_reaper
+from .security import password_hasher
+from .catalog import catalog_store
+from .compression import PrecompressedPage
+
+# Resolvido a partir do módulo, para não depender do diretório de trabalho
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicia e encerra os recursos da aplicação.
+
+    Engines, bcrypt e jose são criados ou importados no primeiro uso;
+    aqui ficam só o catálogo e a página inicial, e a calibração do
+    bcrypt roda em segundo plano para não atrasar a primeira requisição.
+    """
+    from fastapi.templating import Jinja2Templates
+
+    catalog_store.load()
+    # A página inicial não depende da requisição: é renderizada e comprimida uma vez
+    templates = Jinja2Templates(directory=TEMPLATES_DIR)
+    app.state.home_page = PrecompressedPage(
+        templates.get_template("index.html").render().encode("utf-8"),
+        media_type="text/html; charset=utf-8",
+        level=GZIP_LEVEL,
+        max_age=HOME_CACHE_SECONDS,
+    )
+
+    tasks = [asyncio.create_task(
+        password_hasher.calibrate(BCRYPT_TARGET_MS, BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS)
+    )]
+    if TOKEN_REAPER_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            run_token_reaper(TOKEN_REAPER_INTERVAL_SECONDS, TOKEN_REAPER_BATCH_SIZE)
+        ))
+
+    yield
 
-app = FastAPI()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,15 +71,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-templates = Jinja2Templates(directory="Backend/templates")
+# Comprime também respostas em streaming; as que já têm Content-Encoding passam direto
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_LEVEL)
 
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
-    return templates.TemplateResponse(
-        "index.html",
-        
-        {"request": request}
-    )
+    return request.app.state.home_page.response(request)
 
 from .Routes.auth import auth_router
 from .Routes.users import users_router
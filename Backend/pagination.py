@@ -0,0 +1,109 @@
+import base64
+import json
+from operator import itemgetter
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Gera o cursor opaco que aponta para depois do último item da página.
+
+    Args:
+        last_id (int): Chave primária do último item retornado.
+
+    Returns:
+        str: Cursor em base64 url-safe.
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Lê um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor recebido do cliente.
+
+    Raises:
+        HTTPException: Caso o cursor seja inválido.
+
+    Returns:
+        int: Chave primária a partir da qual a próxima página começa.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    return last_id
+
+
+def keyset_query(stmt, key_column, cursor, limit: int):
+    """
+    Aplica o filtro, a ordenação e o limite da paginação por chave.
+
+    Um registro a mais é pedido apenas para saber se existe próxima
+    página (ver `split_page`).
+
+    Args:
+        stmt (Select): Consulta base (sem ordenação nem limite).
+        key_column: Coluna única e crescente usada como chave.
+        cursor (str | None): Cursor recebido do cliente.
+        limit (int): Quantidade máxima de registros.
+
+    Returns:
+        Select: Consulta da página.
+    """
+    if cursor:
+        stmt = stmt.where(key_column > decode_cursor(cursor))
+    return stmt.order_by(key_column).limit(limit + 1)
+
+
+def split_page(items: list, limit: int, last_key) -> tuple:
+    """
+    Separa a página do registro extra e gera o cursor da próxima.
+
+    Args:
+        items (list): Registros lidos com `keyset_query`.
+        limit (int): Quantidade máxima de registros.
+        last_key (Callable): Extrai a chave de um registro.
+
+    Returns:
+        tuple[list, str | None]: Registros da página e cursor da próxima.
+    """
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(last_key(items[-1]))
+    return items, next_cursor
+
+
+async def keyset_rows(session: AsyncSession, stmt, key_column, cursor, limit: int, key: str):
+    """
+    Executa uma consulta paginada por chave (keyset).
+
+    A consulta é ordenada por `key_column` e filtrada por
+    `key_column > último id`, de modo que qualquer página custa o
+    mesmo que a primeira, ao contrário de OFFSET. As linhas vêm do
+    Core, como dicionários.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco.
+        stmt (Select): Consulta base com as colunas desejadas.
+        key_column: Coluna única e crescente usada como chave.
+        cursor (str | None): Cursor recebido do cliente.
+        limit (int): Quantidade máxima de registros.
+        key (str): Nome da chave na linha (o rótulo de `key_column`).
+
+    Returns:
+        tuple[list[dict], str | None]: Linhas da página e cursor da próxima.
+    """
+    result = await session.execute(keyset_query(stmt, key_column, cursor, limit))
+    rows = [dict(row) for row in result.mappings()]
+    return split_page(rows, limit, itemgetter(key))
@@ -0,0 +1,51 @@
+from typing import NamedTuple
+
+
+class CartQuote(NamedTuple):
+    """Preço de um carrinho: valor unitário e total de cada linha, e o total."""
+    unit_prices: list
+    line_totals: list
+    total_cents: int
+
+
+def _modifier(option) -> int:
+    """Acréscimo de um tamanho ou adicional (zero quando não informado)."""
+    return option.price_cents if option is not None else 0
+
+
+def _price_cart(items) -> CartQuote:
+    unit_prices = [
+        item.product.price_cents + _modifier(item.size) + _modifier(item.addon)
+        for item in items
+    ]
+    line_totals = [unit * item.qty for unit, item in zip(unit_prices, items)]
+    return CartQuote(unit_prices, line_totals, sum(line_totals))
+
+
+def price_carts(carts) -> list:
+    """
+    Calcula os preços de vários carrinhos.
+
+    Valores em centavos, como inteiros do Python (sem limite de
+    tamanho nem arredondamento).
+
+    Args:
+        carts (list[list[CatalogItem]]): Itens já validados de cada carrinho.
+
+    Returns:
+        list[CartQuote]: Preço de cada carrinho, na mesma ordem.
+    """
+    return [_price_cart(items) for items in carts]
+
+
+def order_total(items) -> int:
+    """
+    Total em centavos de um único pedido.
+
+    Args:
+        items (list[CatalogItem]): Itens já validados.
+
+    Returns:
+        int: Soma de preço unitário vezes quantidade.
+    """
+    return _price_cart(items).total_cents
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, SecretStr, conint, Field, ConfigDict
 from typing import Optional, List
+from .config import MAX_ITEM_QTY
 
 class UserSchema(BaseModel):
     name: str
@@ -48,13 +49,21 @@ class LoginSchema(BaseModel):
 
 class OrderItemCreateSchema(BaseModel):
     product_id: str              # ex: "espresso"
-    qty: conint(ge=1)            # mínimo 1
+    qty: conint(ge=1, le=MAX_ITEM_QTY)  # mínimo 1, máximo MAX_ITEM_QTY
     size_id: Optional[str] = None
     addon_id: Optional[str] = None
 
 class OrderCreateSchema(BaseModel):
     items: List[OrderItemCreateSchema]
 
+class OrderQuoteSchema(BaseModel):
+    carts: List[OrderCreateSchema] = Field(min_length=1)
+
+class OrderBatchCreateSchema(BaseModel):
+    # Cada pedido é validado individualmente para que um pedido
+    # inválido não invalide o lote inteiro
+    orders: List[dict] = Field(min_length=1)
+
 
 
 # Response Schemas
@@ -81,4 +90,54 @@ class OrderResponseSchema(BaseModel):
 
     user_id: int
     order_id: int = Field(alias="id")
-    items: List["OrderItemResponseSchema"]
\ No newline at end of file
+    total_cents: Optional[int] = None
+    items: List["OrderItemResponseSchema"]
+
+
+class OrderBatchResultSchema(BaseModel):
+    index: int
+    ok: bool
+    order_id: Optional[int] = None
+    error: Optional[str] = None
+
+class OrderBatchResponseSchema(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBatchResultSchema]
+
+
+class QuoteLineSchema(BaseModel):
+    product_id: str
+    qty: int
+    size_id: Optional[str] = None
+    addon_id: Optional[str] = None
+    unit_price_cents: int
+    total_cents: int
+
+class CartQuoteSchema(BaseModel):
+    items: List[QuoteLineSchema]
+    total_cents: int
+
+class OrderQuoteResponseSchema(BaseModel):
+    carts: List[CartQuoteSchema]
+    total_cents: int
+
+
+class ProductSummarySchema(BaseModel):
+    product_id: str
+    orders: int
+    qty: int
+
+class OrderSummarySchema(BaseModel):
+    orders: int
+    items: int
+    products: List[ProductSummarySchema]
+
+
+class UserPageSchema(BaseModel):
+    items: List[UserResponseSchema]
+    next_cursor: Optional[str] = None
+
+class OrderPageSchema(BaseModel):
+    items: List[OrderResponseSchema]
+    next_cursor: Optional[str] = None
\ No newline at end of file
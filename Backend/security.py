@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from .config import (
+    SECRET_KEY,
+    ALGORITHM,
+    BCRYPT_WORKERS,
+    BCRYPT_MAX_PENDING,
+    BCRYPT_ROUNDS,
+)
+
+
+def token_digest(token: str) -> str:
+    """
+    Calcula o digest SHA-256 (hex, 64 caracteres) de um token.
+
+    O banco guarda apenas este digest, nunca o token em si.
+
+    Args:
+        token (str): Token JWT.
+
+    Returns:
+        str: Digest hexadecimal do token.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def decode_token(token: str) -> dict:
+    """
+    Valida localmente a assinatura e a expiração de um token JWT.
+
+    Args:
+        token (str): Token JWT recebido na requisição.
+
+    Raises:
+        HTTPException: Caso a assinatura seja inválida, o token
+            esteja expirado ou faltem claims obrigatórias.
+
+    Returns:
+        dict: Claims do token.
+    """
+    # bcrypt e jose são importados só no primeiro uso, fora da inicialização
+    from jose import jwt, JWTError
+
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+    if "sub" not in claims or "exp" not in claims or "jti" not in claims:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+    return claims
+
+
+class TokenDenylist:
+    """
+    Conjunto em memória dos identificadores (`jti`) de tokens revogados.
+
+    Contém apenas tokens revogados que ainda não expiraram, por isso
+    permanece pequeno. É recarregado do banco a cada
+    `refresh_seconds`, para que revogações feitas por outros
+    processos sejam percebidas.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._jtis = frozenset()
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        """Indica se a lista deve ser recarregada do banco."""
+        return time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def replace(self, jtis):
+        """
+        Substitui o conteúdo da lista pelo estado atual do banco.
+
+        Args:
+            jtis (Iterable[str]): Identificadores revogados.
+        """
+        with self._lock:
+            self._jtis = frozenset(jtis)
+            self._loaded_at = time.monotonic()
+
+    def add(self, jti: str):
+        """
+        Revoga um token imediatamente neste processo.
+
+        Args:
+            jti (str): Identificador do token.
+        """
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def __contains__(self, jti) -> bool:
+        return jti in self._jtis
+
+    def __len__(self) -> int:
+        return len(self._jtis)
+
+
+class PasswordHasher:
+    """
+    Executa o bcrypt em um pool de threads de tamanho limitado.
+
+    O bcrypt libera o GIL durante o cálculo, então as threads rodam
+    em paralelo sem bloquear o event loop. Quando há mais de
+    `max_pending` operações em andamento ou na fila, novas chamadas
+    são recusadas com 503 em vez de acumular latência.
+
+    O custo (`rounds`) usado em novos hashes pode ser fixo ou
+    calibrado para o hardware com `calibrate`.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int | None = None):
+        self.max_pending = max_pending
+        self.rounds = rounds or 12
+        self.calibrated = rounds is not None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, senha: str) -> str:
+        """
+        Gera o hash bcrypt de uma senha.
+
+        Args:
+            senha (str): Senha em texto puro.
+
+        Returns:
+            str: Hash bcrypt da senha.
+        """
+        import bcrypt
+
+        hashed = await self._run(bcrypt.hashpw, senha.encode("utf-8"), bcrypt.gensalt(self.rounds))
+        return hashed.decode("utf-8")
+
+    async def check(self, senha: str, hashed: str) -> bool:
+        """
+        Confere uma senha contra o hash armazenado.
+
+        Args:
+            senha (str): Senha em texto puro.
+            hashed (str): Hash bcrypt armazenado.
+
+        Returns:
+            bool: True se a senha confere.
+        """
+        import bcrypt
+
+        return await self._run(bcrypt.checkpw, senha.encode("utf-8"), hashed.encode("utf-8"))
+
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Indica se um hash foi gerado com custo menor que o atual.
+
+        O custo só sobe: hashes mais caros que o atual são mantidos,
+        para que processos com custos diferentes não refaçam o hash
+        do mesmo usuário alternadamente. Antes da calibração terminar
+        nenhum hash é refeito.
+
+        Args:
+            hashed (str): Hash bcrypt armazenado (`$2b$<custo>$...`).
+
+        Returns:
+            bool: True se o hash deve ser refeito.
+        """
+        if not self.calibrated:
+            return False
+        try:
+            return int(hashed.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    async def calibrate(self, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+        """
+        Escolhe o custo cujo hash leva o tempo mais próximo de `target_ms`.
+
+        Mede um hash com `min_rounds` e extrapola, já que cada
+        incremento de custo dobra o tempo do bcrypt. O custo é
+        arredondado para o mais próximo em escala logarítmica, e não
+        para o maior abaixo do alvo: a fronteira fica a meia duplicação
+        do tempo medido, e processos na mesma máquina, com medições um
+        pouco diferentes, chegam ao mesmo custo. Para garantir o mesmo
+        custo em todos os processos, fixe `BCRYPT_ROUNDS`; nesse caso
+        a calibração não faz nada.
+
+        Args:
+            target_ms (float): Latência alvo por hash, em milissegundos.
+            min_rounds (int): Custo mínimo aceito.
+            max_rounds (int): Custo máximo aceito.
+
+        Returns:
+            int: Custo em uso após a calibração.
+        """
+        if self.calibrated:
+            return self.rounds
+
+        loop = asyncio.get_running_loop()
+        elapsed = min([
+            await loop.run_in_executor(self._executor, _time_hash, min_rounds)
+            for _ in range(3)
+        ])
+
+        ideal = min_rounds + math.log2(target_ms / (elapsed * 1000))
+        rounds = max(min_rounds, min(max_rounds, round(ideal)))
+
+        self.rounds = rounds
+        self.calibrated = True
+        return rounds
+
+
+def _time_hash(rounds: int) -> float:
+    import bcrypt
+
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+    return time.perf_counter() - start
+
+
+password_hasher = PasswordHasher(
+    workers=BCRYPT_WORKERS,
+    max_pending=BCRYPT_MAX_PENDING,
+    rounds=BCRYPT_ROUNDS
+)
@@ -0,0 +1,89 @@
+import json
+from fastapi.responses import Response
+from sqlalchemy import select
+from Backend.Database.database import User, Order, OrderItem
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+# Colunas lidas pelas listagens, no formato das respostas
+USER_COLUMNS = (User.id, User.name, User.email)
+ORDER_COLUMNS = (Order.id, Order.user_id, Order.total_cents)
+ORDER_ITEM_COLUMNS = (
+    OrderItem.order_id,
+    OrderItem.product_id,
+    OrderItem.qty,
+    OrderItem.size_id,
+    OrderItem.addon_id,
+)
+
+
+def dumps(content) -> bytes:
+    """
+    Serializa `content` em JSON compacto.
+
+    Usa orjson quando instalado; caso contrário, o módulo `json`.
+
+    Args:
+        content: Dicionários, listas e tipos primitivos.
+
+    Returns:
+        bytes: JSON em UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    Resposta JSON para conteúdo já no formato final.
+
+    Não passa pelo `jsonable_encoder` nem pela validação do
+    `response_model`: o conteúdo deve ser composto só de tipos
+    primitivos, como as linhas montadas por `attach_items`.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+async def attach_items(session, orders: list) -> list:
+    """
+    Completa pedidos lidos como linhas do Core com seus itens.
+
+    Os itens de todos os pedidos vêm de uma única consulta e são
+    agrupados em memória, sem objetos do ORM.
+
+    Args:
+        session (AsyncSession): Sessão ativa do banco.
+        orders (list[dict]): Pedidos com as colunas de `ORDER_COLUMNS`.
+
+    Returns:
+        list[dict]: Os mesmos pedidos, no formato de `OrderResponseSchema`.
+    """
+    if not orders:
+        return orders
+
+    by_id = {}
+    for order in orders:
+        order["items"] = []
+        by_id[order["id"]] = order["items"]
+
+    result = await session.execute(
+        select(*ORDER_ITEM_COLUMNS)
+        .where(OrderItem.order_id.in_(by_id))
+        .order_by(OrderItem.order_id, OrderItem.id)
+    )
+    for order_id, product_id, qty, size_id, addon_id in result:
+        by_id[order_id].append({
+            "product_id": product_id,
+            "qty": qty,
+            "size_id": size_id,
+            "addon_id": addon_id,
+        })
+
+    return orders
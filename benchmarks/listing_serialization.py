@@ -0,0 +1,104 @@
+"""
+Mede o custo de montar a resposta das listagens de pedidos.
+
+Compara o caminho antigo (objetos do ORM com `selectinload`, validados
+por `OrderResponseSchema` com `from_attributes` e serializados pelo
+`JSONResponse` do FastAPI) com o novo (linhas do Core e
+`FastJSONResponse`), para 100, 1.000 e 10.000 pedidos. Antes de medir,
+confere que os dois caminhos geram o mesmo JSON.
+
+Uso:
+    python benchmarks/listing_serialization.py [--items N] [--repeat N]
+
+Usa um arquivo SQLite temporário, criado antes de importar o Backend.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{PATH}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from Backend.Database.database import Base, User, Order, OrderItem, get_engine, AsyncSessionLocal  # noqa: E402
+from Backend.schemas import OrderResponseSchema  # noqa: E402
+from Backend.serialization import FastJSONResponse, ORDER_COLUMNS, attach_items  # noqa: E402
+
+SIZES = (100, 1_000, 10_000)
+
+
+def seed(orders: int, items: int):
+    """Recria as tabelas com `orders` pedidos de `items` itens cada."""
+    db = get_engine()
+    Base.metadata.drop_all(db)
+    Base.metadata.create_all(db)
+    with db.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": 1, "name": "bench", "email": "bench@example.com",
+            "senha": "-", "ativo": True, "remember": False, "admin": False,
+        }])
+        conn.execute(insert(Order), [{"id": i, "user_id": 1, "total_cents": 1000} for i in range(1, orders + 1)])
+        conn.execute(insert(OrderItem), [
+            {"order_id": i, "product_id": "latte", "qty": 1, "size_id": "m", "addon_id": None}
+            for i in range(1, orders + 1)
+            for _ in range(items)
+        ])
+
+
+async def orm_path(limit: int) -> bytes:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Order).options(selectinload(Order.items)).order_by(Order.id).limit(limit)
+        )
+        orders = result.scalars().all()
+        content = jsonable_encoder([
+            OrderResponseSchema.model_validate(order).model_dump(by_alias=True) for order in orders
+        ])
+        return JSONResponse(content).body
+
+
+async def core_path(limit: int) -> bytes:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(*ORDER_COLUMNS).order_by(Order.id).limit(limit))
+        orders = [dict(row) for row in result.mappings()]
+        return FastJSONResponse(await attach_items(session, orders)).body
+
+
+async def measure(fn, limit: int, repeat: int) -> float:
+    await fn(limit)  # aquece conexões e caches de compilação
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(limit)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=3, help="itens por pedido")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(max(SIZES), args.items)
+    # Os dois caminhos devem gerar a mesma resposta (formato da API)
+    if json.loads(await orm_path(100)) != json.loads(await core_path(100)):
+        raise SystemExit("Os caminhos ORM e Core geraram respostas diferentes")
+
+    print(f"{'pedidos':>8} {'ORM + schema':>14} {'Core + JSON':>14} {'ganho':>7}")
+    for size in SIZES:
+        before = await measure(orm_path, size, args.repeat)
+        after = await measure(core_path, size, args.repeat)
+        print(f"{size:>8} {before * 1e3:>11.1f} ms {after * 1e3:>11.1f} ms {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Mede o custo por requisição de abrir uma sessão e executar uma consulta.
+
+Compara o padrão antigo do `get_session` (um `sessionmaker` novo a cada
+requisição e `pool_pre_ping` sempre ativo) com a fábrica de sessão
+criada uma única vez, com e sem pre-ping.
+
+Uso:
+    python benchmarks/session_overhead.py [DATABASE_URL] [--requests N]
+
+Sem URL, usa um arquivo SQLite temporário. Para números representativos
+de produção, aponte para um PostgreSQL.
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+
+def per_request_factory(engine, requests):
+    for _ in range(requests):
+        SessionLocal = sessionmaker(bind=engine)
+        session = SessionLocal()
+        try:
+            session.execute(text("SELECT 1"))
+        finally:
+            session.close()
+
+
+def shared_factory(engine, requests):
+    SessionLocal = sessionmaker(bind=engine)
+    for _ in range(requests):
+        session = SessionLocal()
+        try:
+            session.execute(text("SELECT 1"))
+        finally:
+            session.close()
+
+
+def run(label, fn, engine, requests):
+    fn(engine, 50)  # aquece o pool
+    start = time.perf_counter()
+    fn(engine, requests)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / requests * 1e6:8.1f} µs/req")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url", nargs="?")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite:///{path}"
+
+    ping = create_engine(url, pool_pre_ping=True)
+    no_ping = create_engine(url, pool_pre_ping=False)
+
+    run("antes: sessionmaker por req + pre-ping", per_request_factory, ping, args.requests)
+    run("fábrica compartilhada + pre-ping", shared_factory, ping, args.requests)
+    run("fábrica compartilhada sem pre-ping", shared_factory, no_ping, args.requests)
+
+
+if __name__ == "__main__":
+    main()
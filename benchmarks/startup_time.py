@@ -0,0 +1,77 @@
+"""
+Mede o tempo de inicialização da aplicação em processos novos.
+
+Duas medidas, cada uma repetida e resumida pela mediana:
+
+- import: tempo de `import Backend.main` em um interpretador limpo;
+- primeira resposta: do início do processo do uvicorn até o primeiro
+  `GET /` respondido com 200 (import, lifespan e a requisição).
+
+Uso:
+    python benchmarks/startup_time.py [--runs N] [--port PORTA]
+
+Rode a partir da raiz do repositório. Sem `DATABASE_URL` no ambiente,
+usa um SQLite temporário (nenhuma das medidas precisa abrir conexão).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import Backend.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_request(env: dict, port: int, timeout: float = 30.0) -> float:
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "Backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"Servidor não respondeu em {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first = [measure_first_request(env, args.port) for _ in range(args.runs)]
+
+    print(f"{'import Backend.main':<30} {statistics.median(imports) * 1e3:8.1f} ms")
+    print(f"{'processo até 1ª resposta':<30} {statistics.median(first) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
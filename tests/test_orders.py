@@ -0,0 +1,156 @@
+"""
+Testes das rotas de pedidos em um SQLite temporário.
+
+Fixam a quantidade de consultas das listagens (detecção de N+1) e
+cobrem criação, alteração e remoção de pedidos, incluindo os
+agregados de `/requests/me/summary`.
+
+Uso:
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+# Configuração definida antes de importar o Backend
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["AUTH_MODE"] = "database"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["TOKEN_REAPER_INTERVAL_SECONDS"] = "0"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from Backend.main import app  # noqa: E402
+from Backend.Database.database import Base, get_engine, get_async_engine  # noqa: E402
+from Backend.Database.query_counter import assert_num_queries  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.create_all(get_engine())
+    with TestClient(app) as client:
+        yield client
+    Base.metadata.drop_all(get_engine())
+
+
+def signup_and_login(client, email: str, admin: bool = False) -> dict:
+    """Cria um usuário, faz login e devolve os headers de autenticação."""
+    response = client.post("/users", json={
+        "schema_user": {"name": "Teste", "email": email, "senha": "senha-segura", "admin": admin},
+        "schema_local": {"cep": "01000-000", "city": "SP", "neighborhood": "Centro", "street": "Rua A", "number": "1"},
+    })
+    assert response.status_code == 200, response.text
+
+    response = client.post("/auth/login", json={"email": email, "senha": "senha-segura"})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Aquece o cache de tokens, para que as contagens não incluam a validação
+    client.get("/users/me", headers=headers)
+    return headers
+
+
+def create_order(client, headers: dict, items: list) -> dict:
+    response = client.post("/requests", json={"items": items}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_create_update_delete_order_keeps_summary(client):
+    headers = signup_and_login(client, "crud@example.com")
+
+    order = create_order(client, headers, [
+        {"product_id": "latte", "qty": 2},
+        {"product_id": "espresso", "qty": 1},
+    ])
+    assert order["total_cents"] > 0
+    assert client.get("/requests/me/summary", headers=headers).json()["items"] == 3
+
+    response = client.put(f"/requests/{order['id']}", json={"items": [
+        {"product_id": "latte", "qty": 5},
+    ]}, headers=headers)
+    assert response.status_code == 200, response.text
+    summary = client.get("/requests/me/summary", headers=headers).json()
+    assert summary["orders"] == 1
+    assert summary["items"] == 5
+    assert [p["product_id"] for p in summary["products"]] == ["latte"]
+
+    response = client.delete(f"/requests/{order['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    summary = client.get("/requests/me/summary", headers=headers).json()
+    assert summary == {"orders": 0, "items": 0, "products": []}
+    assert client.get("/requests/me", headers=headers).status_code == 404
+
+
+def test_create_order_rejects_unknown_product(client):
+    headers = signup_and_login(client, "catalog@example.com")
+
+    response = client.post("/requests", json={"items": [{"product_id": "pizza", "qty": 1}]}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_order_rejects_qty_above_limit(client):
+    headers = signup_and_login(client, "qty@example.com")
+    items = [{"product_id": "latte", "qty": 10**19}]
+
+    assert client.post("/requests", json={"items": items}, headers=headers).status_code == 422
+    assert client.post("/requests/quote", json={"carts": [{"items": items}]}, headers=headers).status_code == 422
+
+
+def test_list_my_orders_query_count(client):
+    headers = signup_and_login(client, "me@example.com")
+    for qty in range(1, 6):
+        create_order(client, headers, [{"product_id": "latte", "qty": qty}, {"product_id": "croissant", "qty": 1}])
+
+    # Versão do usuário, pedidos e itens, independente da quantidade de pedidos
+    with assert_num_queries(get_async_engine(), 3):
+        response = client.get("/requests/me", headers=headers)
+    assert response.status_code == 200
+    orders = response.json()
+    assert len(orders) == 5
+    assert all("id" in order and len(order["items"]) == 2 for order in orders)
+    # O mesmo ETag vale para o corpo com e sem gzip, então é fraco
+    assert response.headers["ETag"].startswith('W/"')
+
+    # Com o ETag atual, só a versão é consultada
+    with assert_num_queries(get_async_engine(), 1):
+        response = client.get("/requests/me", headers={**headers, "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_list_all_orders_query_count(client):
+    headers = signup_and_login(client, "admin@example.com", admin=True)
+    for _ in range(3):
+        create_order(client, headers, [{"product_id": "mocha", "qty": 1}])
+
+    # Página de pedidos e itens da página
+    with assert_num_queries(get_async_engine(), 2):
+        response = client.get("/requests/orders", params={"limit": 100}, headers=headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) >= 3
+    assert all("id" in order for order in page["items"])
+
+
+def test_batch_orders_count_each_order_per_product(client):
+    headers = signup_and_login(client, "batch@example.com")
+    items = [{"product_id": "latte", "qty": 1}, {"product_id": "croissant", "qty": 2}]
+
+    response = client.post("/requests/batch", json={"orders": [{"items": items}] * 3}, headers=headers)
+    assert response.status_code == 200, response.text
+    order_ids = [result["order_id"] for result in response.json()["results"]]
+    assert len(order_ids) == 3
+
+    summary = client.get("/requests/me/summary", headers=headers).json()
+    assert summary["orders"] == 3
+    assert summary["items"] == 9
+    assert {p["product_id"]: p["orders"] for p in summary["products"]} == {"latte": 3, "croissant": 3}
+
+    response = client.delete(f"/requests/{order_ids[0]}", headers=headers)
+    assert response.status_code == 200, response.text
+    summary = client.get("/requests/me/summary", headers=headers).json()
+    assert {p["product_id"]: p["orders"] for p in summary["products"]} == {"latte": 2, "croissant": 2}